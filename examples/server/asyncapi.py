@@ -1,9 +1,17 @@
 import datetime
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 from src import fastsio
-from src.fastsio import SocketID, Environ, Auth, AsyncServer, Data, AsyncAPIConfig
+from src.fastsio import (
+    SocketID,
+    Environ,
+    Auth,
+    AsyncServer,
+    Data,
+    DictData,
+    AsyncAPIConfig,
+)
 from src.fastsio.types import Reason, Event
 
 router = fastsio.RouterSIO()
@@ -14,6 +22,11 @@ class DataMessage(BaseModel):
     text: str
 
 
+class StrictDataMessage(DataMessage):
+    # Strict and closed: a payload that validates is exactly its own dump
+    model_config = ConfigDict(extra="forbid", strict=True)
+
+
 class EditMessage(BaseModel):
     session_id: str
     text: str
@@ -21,8 +34,11 @@ class EditMessage(BaseModel):
 
 
 @router.on("message.send", response_model={"message.new": DataMessage})
-async def message__send(sid: SocketID, sio: AsyncServer, data: DataMessage):
-    await sio.emit("message.new", data=data.model_dump(), to=sid)
+async def message__send(
+    sid: SocketID, sio: AsyncServer, data: StrictDataMessage, payload: DictData
+):
+    # The payload passed validation unchanged, echo it without model_dump()
+    await sio.emit("message.new", data=payload, to=sid)
 
 
 @router.on("message.edit")
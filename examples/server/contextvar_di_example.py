@@ -10,11 +10,10 @@ This example shows how to use the new dependency injection system with:
 """
 
 import asyncio
-import json
 from dataclasses import dataclass
-from typing import Dict, Optional
+from typing import Dict, Optional, Set
 
-from fastsio import AsyncServer, SocketID, Data, Depends, register_dependency
+from fastsio import AsyncServer, SocketID, DictData, Depends, register_dependency
 from pydantic import BaseModel
 
 
@@ -49,7 +48,11 @@ fake_database: Dict[str, UserProfile] = {
     "user1": UserProfile(user_id="user1", username="alice", email="alice@example.com"),
     "user2": UserProfile(user_id="user2", username="bob", email="bob@example.com"),
 }
-cache_store: Dict[str, str] = {}
+cache_store: Dict[str, Set[str]] = {}
+# Mock user IDs, derived from the sid once per connection
+user_ids: Dict[str, str] = {}
+# set.add/discard/len are atomic, so admission needs no lock
+connected_sids: Set[str] = set()
 
 
 # Dependency factories
@@ -58,6 +61,12 @@ def get_config() -> AppConfig:
     return app_config
 
 
+def get_user_id(sid: SocketID) -> str:
+    """Get the user ID of the current connection."""
+    # In real app, this would come from auth
+    return user_ids[sid]
+
+
 async def get_database():
     """Mock database connection."""
     # In real app, this would be a proper database connection
@@ -71,56 +80,54 @@ async def get_cache():
     return cache_store
 
 
-async def get_user_service(db=Depends(get_database)):
-    """User service that depends on database."""
+class UserService:
+    __slots__ = ("db",)
 
-    class UserService:
-        def __init__(self, db):
-            self.db = db
+    def __init__(self, db):
+        self.db = db
 
-        async def get_user(self, user_id: str) -> Optional[UserProfile]:
-            return self.db.get(user_id)
+    async def get_user(self, user_id: str) -> Optional[UserProfile]:
+        return self.db.get(user_id)
 
-        async def user_exists(self, user_id: str) -> bool:
-            return user_id in self.db
+    async def user_exists(self, user_id: str) -> bool:
+        return user_id in self.db
 
-    return UserService(db)
 
+class RoomService:
+    __slots__ = ("cache",)
 
-async def get_room_service(cache=Depends(get_cache)):
-    """Room service with caching."""
+    def __init__(self, cache):
+        self.cache = cache
 
-    class RoomService:
-        def __init__(self, cache):
-            self.cache = cache
-            self.rooms: Dict[str, set] = {}
-
-        async def join_room(self, room: str, user_id: str):
-            if room not in self.rooms:
-                self.rooms[room] = set()
-            self.rooms[room].add(user_id)
-
-            # Cache room info
-            cache_key = f"room:{room}"
-            room_info = {
-                "name": room,
-                "members": len(self.rooms[room]),
-                "users": list(self.rooms[room]),
-            }
-            self.cache[cache_key] = json.dumps(room_info)
-
-        async def leave_room(self, room: str, user_id: str):
-            if room in self.rooms:
-                self.rooms[room].discard(user_id)
-                if not self.rooms[room]:
-                    del self.rooms[room]
-
-        async def get_room_info(self, room: str):
-            cache_key = f"room:{room}"
-            if cache_key in self.cache:
-                return json.loads(self.cache[cache_key])
+    async def join_room(self, room: str, user_id: str) -> int:
+        # Members are kept as a live set, the roster is only
+        # materialized when someone asks for it
+        members = self.cache.setdefault(f"room:{room}", set())
+        members.add(user_id)
+        return len(members)
+
+    async def leave_room(self, room: str, user_id: str):
+        cache_key = f"room:{room}"
+        members = self.cache.get(cache_key)
+        if members is not None:
+            members.discard(user_id)
+            if not members:
+                del self.cache[cache_key]
+
+    async def get_room_info(self, room: str):
+        members = self.cache.get(f"room:{room}")
+        if members is None:
             return None
+        return {"name": room, "members": len(members), "users": list(members)}
+
+
+async def get_user_service(db=Depends(get_database)):
+    """User service that depends on database."""
+    return UserService(db)
 
+
+async def get_room_service(cache=Depends(get_cache)):
+    """Room service with caching."""
     return RoomService(cache)
 
 
@@ -142,15 +149,18 @@ async def connect(
     """Handle client connection with dependency injection."""
     print(f"🔗 Client {sid} connecting...")
 
-    # Check connection limits
-    if len(sio.manager.get_participants("/", "/")) >= config.max_connections:
-        print(f"❌ Connection limit reached for {sid}")
-        return False
-
     if not config.allow_anonymous:
         print(f"❌ Anonymous connections not allowed for {sid}")
         return False
 
+    # Optimistically take a slot and give it back if the limit was exceeded
+    connected_sids.add(sid)
+    if len(connected_sids) > config.max_connections:
+        connected_sids.discard(sid)
+        print(f"❌ Connection limit reached for {sid}")
+        return False
+
+    user_ids[sid] = f"user_{sid[:8]}"
     print(f"✅ Client {sid} connected successfully")
     return True
 
@@ -158,6 +168,8 @@ async def connect(
 @sio.event
 async def disconnect(sid: SocketID):
     """Handle client disconnection."""
+    connected_sids.discard(sid)
+    user_ids.pop(sid, None)
     print(f"👋 Client {sid} disconnected")
 
 
@@ -167,29 +179,27 @@ async def join_room(
     data: JoinRoomMessage,
     room_service=Depends(get_room_service),
     user_service=Depends(get_user_service),
+    user_id: str = Depends(get_user_id),
 ):
     """Join a room with validation and dependency injection."""
     print(f"🏠 {sid} wants to join room: {data.room}")
 
-    # Mock user ID (in real app, get from auth)
-    user_id = f"user_{sid[:8]}"
-
     # Join room using service
-    await room_service.join_room(data.room, user_id)
+    members = await room_service.join_room(data.room, user_id)
     await sio.enter_room(sid, data.room)
 
-    # Get room info
-    room_info = await room_service.get_room_info(data.room)
+    emit = sio.emit
 
-    # Notify room members
-    await sio.emit(
+    # Notify room members, they only need to know who joined
+    await emit(
         "user_joined",
-        {"user_id": user_id, "room": data.room, "room_info": room_info},
+        {"user_id": user_id, "room": data.room, "members": members},
         room=data.room,
     )
 
-    # Confirm to user
-    await sio.emit("joined_room", {"room": data.room, "room_info": room_info}, to=sid)
+    # Confirm to user, with the full room roster
+    room_info = await room_service.get_room_info(data.room)
+    await emit("joined_room", {"room": data.room, "room_info": room_info}, to=sid)
 
 
 @sio.on("send_message")
@@ -198,13 +208,12 @@ async def send_message(
     data: SendMessage,
     user_service=Depends(get_user_service),
     config: AppConfig = Depends("config"),  # Using registered dependency
+    user_id: str = Depends(get_user_id),
 ):
     """Send message to room with dependency injection."""
+    loop = asyncio.get_running_loop()
     print(f"💬 {sid} sending message to {data.room}: {data.message}")
 
-    # Mock user ID
-    user_id = f"user_{sid[:8]}"
-
     # Get user info
     user = await user_service.get_user(user_id)
     username = user.username if user else f"Anonymous_{sid[:8]}"
@@ -217,7 +226,7 @@ async def send_message(
             "message": data.message,
             "user_id": user_id,
             "username": username,
-            "timestamp": asyncio.get_event_loop().time(),
+            "timestamp": loop.time(),
         },
         room=data.room,
     )
@@ -225,10 +234,10 @@ async def send_message(
 
 @sio.on("get_profile")
 async def get_profile(
-    sid: SocketID, data: Data, user_service=Depends(get_user_service)
+    sid: SocketID, data: DictData, user_service=Depends(get_user_service)
 ):
     """Get user profile with dependency injection."""
-    user_id = data.get("user_id") if isinstance(data, dict) else None
+    user_id = data.get("user_id")
 
     if not user_id:
         await sio.emit("error", {"message": "user_id required"}, to=sid)
@@ -236,17 +245,17 @@ async def get_profile(
 
     user = await user_service.get_user(user_id)
     if user:
-        await sio.emit("profile", user.dict(), to=sid)
+        await sio.emit("profile", user.model_dump(), to=sid)
     else:
         await sio.emit("error", {"message": "User not found"}, to=sid)
 
 
 @sio.on("room_info")
 async def get_room_info(
-    sid: SocketID, data: Data, room_service=Depends(get_room_service)
+    sid: SocketID, data: DictData, room_service=Depends(get_room_service)
 ):
     """Get room information with caching."""
-    room = data.get("room") if isinstance(data, dict) else None
+    room = data.get("room")
 
     if not room:
         await sio.emit("error", {"message": "room required"}, to=sid)
@@ -53,26 +53,48 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def on_event(event: str):
+    """Mark a CustomMiddleware method as the data mutator for an event."""
+
+    def decorator(func):
+        func._mutates_event = event
+        return func
+
+    return decorator
+
+
 class CustomMiddleware(BaseMiddleware):
     """Custom middleware that modifies data and logs events."""
 
     def __init__(self):
         super().__init__(events=["message", "join_room"])
+        self._loop = None
+        # Map event names to the bound methods that mutate their data
+        self._mutators = {}
+        for name in dir(type(self)):
+            event = getattr(getattr(type(self), name), "_mutates_event", None)
+            if event is not None:
+                self._mutators[event] = getattr(self, name)
 
     async def before_event(self, event: str, sid: str, data: Any, **kwargs):
         """Modify data before handler execution."""
-        logger.info(f"CustomMiddleware: Processing {event} from {sid}")
-
-        if event == "message" and isinstance(data, dict):
+        logger.info("CustomMiddleware: Processing %s from %s", event, sid)
+        mutator = self._mutators.get(event)
+        return data if mutator is None else mutator(data)
+
+    @on_event("message")
+    def _stamp_message(self, data: Any):
+        if isinstance(data, dict):
+            if self._loop is None:
+                self._loop = asyncio.get_running_loop()
             # Add timestamp to message data
-            data["timestamp"] = asyncio.get_event_loop().time()
+            data["timestamp"] = self._loop.time()
             data["processed_by"] = "CustomMiddleware"
-
         return data
 
     async def after_event(self, event: str, sid: str, response: Any, **kwargs):
         """Modify response after handler execution."""
-        logger.info(f"CustomMiddleware: Completed {event} from {sid}")
+        logger.info("CustomMiddleware: Completed %s from %s", event, sid)
 
         if isinstance(response, dict):
             response["middleware_processed"] = True
@@ -92,10 +114,10 @@ class AuthCheckMiddleware(BaseMiddleware):
         """Check if user is authenticated."""
         # Simulate auth check based on environ
         if environ and environ.get("HTTP_AUTHORIZATION"):
-            logger.info(f"AuthCheckMiddleware: {sid} is authenticated")
+            logger.info("AuthCheckMiddleware: %s is authenticated", sid)
             return data
         else:
-            logger.warning(f"AuthCheckMiddleware: {sid} is not authenticated")
+            logger.warning("AuthCheckMiddleware: %s is not authenticated", sid)
             raise PermissionError(f"Authentication required for {event}")
 
 
@@ -107,12 +129,12 @@ class SyncLoggingMiddleware(SyncMiddleware):
 
     def before_event(self, event: str, sid: str, data: Any, **kwargs):
         """Log before event execution."""
-        logger.info(f"SyncLoggingMiddleware: {event} from {sid}")
+        logger.info("SyncLoggingMiddleware: %s from %s", event, sid)
         return data
 
     def after_event(self, event: str, sid: str, response: Any, **kwargs):
         """Log after event execution."""
-        logger.info(f"SyncLoggingMiddleware: {event} from {sid} completed")
+        logger.info("SyncLoggingMiddleware: %s from %s completed", event, sid)
         return response
 
 
@@ -137,7 +159,8 @@ async def main():
     # Add sync middleware for connection events
     sio.add_middleware(SyncLoggingMiddleware())
 
-    # Add namespace-specific middleware
+    # Add namespace-specific middleware. Filters are stored on the middleware
+    # instance, so this needs its own instance rather than the global one
     sio.add_middleware(
         logging_middleware(logger), namespace="/admin", events=["admin_action"]
     )
@@ -146,18 +169,18 @@ async def main():
     @sio.event
     async def connect(sid: SocketID, environ: Environ, auth: Auth):
         """Handle client connection."""
-        logger.info(f"Client {sid} connected")
+        logger.info("Client %s connected", sid)
         return True
 
     @sio.event
     async def disconnect(sid: SocketID):
         """Handle client disconnection."""
-        logger.info(f"Client {sid} disconnected")
+        logger.info("Client %s disconnected", sid)
 
     @sio.event
     async def message(sid: SocketID, data: Data):
         """Handle message event."""
-        logger.info(f"Message from {sid}: {data}")
+        logger.info("Message from %s: %s", sid, data)
         return {"status": "received", "data": data}
 
     @sio.event
@@ -165,7 +188,7 @@ async def main():
         """Handle join room event."""
         room = data.get("room", "default")
         await sio.enter_room(sid, room)
-        logger.info(f"Client {sid} joined room {room}")
+        logger.info("Client %s joined room %s", sid, room)
         return {"status": "joined", "room": room}
 
     @sio.event
@@ -180,17 +203,17 @@ async def main():
     @sio.event
     async def admin_action(sid: SocketID, data: Data):
         """Handle admin action in admin namespace."""
-        logger.info(f"Admin action from {sid}: {data}")
+        logger.info("Admin action from %s: %s", sid, data)
         return {"status": "admin_action_processed"}
 
     # Print registered middlewares
     logger.info("Registered middlewares:")
     for i, middleware in enumerate(sio.get_middlewares()):
-        logger.info(f"  {i+1}. {middleware.__class__.__name__}")
+        logger.info("  %s. %s", i + 1, middleware.__class__.__name__)
         if middleware.events:
-            logger.info(f"     Events: {middleware.events}")
+            logger.info("     Events: %s", middleware.events)
         if middleware.namespace:
-            logger.info(f"     Namespace: {middleware.namespace}")
+            logger.info("     Namespace: %s", middleware.namespace)
         if middleware.global_middleware:
             logger.info("     Global: True")
 
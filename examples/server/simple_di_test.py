@@ -10,6 +10,8 @@ from pydantic import BaseModel
 
 # Configuration dependency
 class Config:
+    __slots__ = ("app_name", "version")
+
     def __init__(self):
         self.app_name = "FastSIO DI Test"
         self.version = "1.0.0"
@@ -21,6 +23,8 @@ def get_config():
 
 # Simple service dependency
 class MessageService:
+    __slots__ = ("message_count",)
+
     def __init__(self):
         self.message_count = 0
 
@@ -6,13 +6,49 @@
 - Кастомные зависимости
 """
 
-import threading
+import logging
 import time
+from collections import defaultdict, deque
 from dataclasses import dataclass
-from typing import Dict, Optional
+from functools import partial
+from itertools import islice
+from typing import Any, DefaultDict, Deque, Dict, Optional, Set
 
-from fastsio import Server, SocketID, Data, Depends, register_dependency
-from pydantic import BaseModel
+from fastsio import Event, Server, SocketID, Depends, register_dependency
+from pydantic import BaseModel, ValidationError
+
+try:
+    import orjson
+except ImportError:  # orjson опционален, используем стандартный json
+    orjson = None
+    orjson_json = None
+else:
+
+    class orjson_json:  # noqa: N801
+        """Минимальная замена модуля ``json`` на основе orjson."""
+
+        @staticmethod
+        def dumps(obj, **kwargs):
+            return orjson.dumps(obj).decode()
+
+        loads = staticmethod(orjson.loads)
+
+
+if hasattr(orjson, "Fragment"):
+
+    def encode_history_entry(entry: dict):
+        """Сериализовать запись истории один раз при добавлении."""
+        # orjson вставляет Fragment в ответ как есть, без повторного обхода
+        return orjson.Fragment(orjson.dumps(entry))
+
+else:
+
+    def encode_history_entry(entry: dict):
+        """Без orjson.Fragment запись хранится как есть."""
+        return entry
+
+
+logger = logging.getLogger(__name__)
 
 
 # Конфигурация приложения
@@ -32,7 +68,15 @@ class JoinRoomMessage(BaseModel):
 class SendMessage(BaseModel):
     room: str
     message: str
-    timestamp: Optional[float] = None
+    timestamp: Optional[float] = None  # секунды
+
+
+class GetProfileRequest(BaseModel):
+    user_id: str
+
+
+class GetRoomHistoryRequest(BaseModel):
+    room: str
 
 
 class UserProfile(BaseModel):
@@ -47,9 +91,13 @@ fake_database: Dict[str, UserProfile] = {
     "user1": UserProfile(user_id="user1", username="alice", email="alice@example.com"),
     "user2": UserProfile(user_id="user2", username="bob", email="bob@example.com"),
 }
-message_cache: Dict[str, list] = {}
-connection_count = 0
-connection_lock = threading.Lock()
+# История каждой комнаты создается при первом сообщении, храним последние 100
+message_cache: DefaultDict[str, Deque[Any]] = defaultdict(partial(deque, maxlen=100))
+# set.add/discard/len атомарны под GIL, поэтому блокировка не нужна
+connected_sids: Set[str] = set()
+# ID и имя пользователя вычисляются один раз при подключении
+user_ids: Dict[str, str] = {}
+usernames: Dict[str, str] = {}
 
 
 # Фабрики зависимостей
@@ -58,71 +106,87 @@ def get_config() -> AppConfig:
     return app_config
 
 
+def get_user_id(sid: SocketID) -> str:
+    """Получить ID пользователя текущего подключения."""
+    # В реальном приложении получаем из аутентификации
+    return user_ids[sid]
+
+
 def get_database():
     """Получить подключение к базе данных (mock)."""
-    print("🔌 Getting database connection")
     return fake_database
 
 
 def get_cache():
     """Получить кеш (mock)."""
-    print("📦 Getting cache connection")
     return message_cache
 
 
-def get_user_service(db=Depends(get_database)):
-    """Сервис пользователей с зависимостью от БД."""
+class UserService:
+    __slots__ = ("db",)
 
-    class UserService:
-        def __init__(self, db):
-            self.db = db
+    def __init__(self, db):
+        self.db = db
 
-        def get_user(self, user_id: str) -> Optional[UserProfile]:
-            return self.db.get(user_id)
+    def get_user(self, user_id: str) -> Optional[UserProfile]:
+        return self.db.get(user_id)
 
-        def user_exists(self, user_id: str) -> bool:
-            return user_id in self.db
+    def user_exists(self, user_id: str) -> bool:
+        return user_id in self.db
 
-    return UserService(db)
 
+class RoomService:
+    __slots__ = ("cache", "rooms")
 
-def get_room_service(cache=Depends(get_cache)):
-    """Сервис комнат с кешированием."""
+    def __init__(self, cache):
+        self.cache = cache
+        self.rooms: DefaultDict[str, set] = defaultdict(set)
+
+    def join_room(self, room: str, user_id: str) -> int:
+        members = self.rooms[room]
+        members.add(user_id)
 
-    class RoomService:
-        def __init__(self, cache):
-            self.cache = cache
-            self.rooms: Dict[str, set] = {}
-
-        def join_room(self, room: str, user_id: str):
-            if room not in self.rooms:
-                self.rooms[room] = set()
-            self.rooms[room].add(user_id)
-
-            # Кешируем информацию о комнате
-            if room not in self.cache:
-                self.cache[room] = []
-
-        def leave_room(self, room: str, user_id: str):
-            if room in self.rooms:
-                self.rooms[room].discard(user_id)
-                if not self.rooms[room]:
-                    del self.rooms[room]
-
-        def get_room_members(self, room: str) -> set:
-            return self.rooms.get(room, set())
-
-        def add_message(self, room: str, message: str, user: str):
-            if room not in self.cache:
-                self.cache[room] = []
-            self.cache[room].append(
-                {"message": message, "user": user, "timestamp": time.time()}
+        # Возвращаем число участников, чтобы не запрашивать их отдельно
+        return len(members)
+
+    def leave_room(self, room: str, user_id: str):
+        members = self.rooms.get(room)
+        if members is not None:
+            members.discard(user_id)
+            if not members:
+                del self.rooms[room]
+
+    def get_room_members(self, room: str) -> set:
+        return self.rooms.get(room, set())
+
+    def add_message(self, room: str, message: str, user: str, timestamp: int):
+        # deque сам вытесняет самые старые сообщения
+        self.cache[room].append(
+            encode_history_entry(
+                {"message": message, "user": user, "timestamp": timestamp}
             )
-            # Ограничиваем историю последними 100 сообщениями
-            if len(self.cache[room]) > 100:
-                self.cache[room] = self.cache[room][-100:]
+        )
+
 
-    return RoomService(cache)
+# Сервисы работают с глобальным состоянием, поэтому создаются один раз
+_user_service: Optional[UserService] = None
+_room_service: Optional[RoomService] = None
+
+
+def get_user_service(db=Depends(get_database)):
+    """Сервис пользователей с зависимостью от БД."""
+    global _user_service
+    if _user_service is None:
+        _user_service = UserService(db)
+    return _user_service
+
+
+def get_room_service(cache=Depends(get_cache)):
+    """Сервис комнат с кешированием."""
+    global _room_service
+    if _room_service is None:
+        _room_service = RoomService(cache)
+    return _room_service
 
 
 # Регистрируем глобальные зависимости
@@ -132,6 +196,7 @@ register_dependency("database", get_database)
 
 # Создаем сервер с AsyncAPI документацией
 sio = Server(
+    json=orjson_json,
     asyncapi={
         "enabled": True,
         "title": "Sync Chat Server API",
@@ -144,7 +209,7 @@ sio = Server(
                 "description": "Development server",
             }
         },
-    }
+    },
 )
 
 
@@ -155,32 +220,36 @@ def connect(
     user_service=Depends(get_user_service),
 ):
     """Обработка подключения клиента с проверкой лимитов."""
-    global connection_count
+    logger.info("🔗 Client %s attempting to connect...", sid)
 
-    print(f"🔗 Client {sid} attempting to connect...")
+    if not config.allow_anonymous:
+        logger.warning("❌ Anonymous connections not allowed for %s", sid)
+        return False
 
-    with connection_lock:
-        if connection_count >= config.max_connections:
-            print(f"❌ Connection limit reached for {sid}")
-            return False
+    # Оптимистично занимаем место и откатываемся, если лимит превышен
+    connected_sids.add(sid)
+    total = len(connected_sids)
+    if total > config.max_connections:
+        connected_sids.discard(sid)
+        logger.warning("❌ Connection limit reached for %s", sid)
+        return False
 
-        if not config.allow_anonymous:
-            print(f"❌ Anonymous connections not allowed for {sid}")
-            return False
+    # Mock user ID (в реальном приложении получаем из аутентификации)
+    user_id = user_ids[sid] = f"user_{sid[:8]}"
+    user = user_service.get_user(user_id)
+    usernames[sid] = user.username if user else f"Anonymous_{sid[:8]}"
 
-        connection_count += 1
-        print(f"✅ Client {sid} connected successfully. Total: {connection_count}")
-        return True
+    logger.info("✅ Client %s connected successfully. Total: %s", sid, total)
+    return True
 
 
 @sio.event
 def disconnect(sid: SocketID):
     """Обработка отключения клиента."""
-    global connection_count
-
-    with connection_lock:
-        connection_count -= 1
-        print(f"👋 Client {sid} disconnected. Total: {connection_count}")
+    connected_sids.discard(sid)
+    user_ids.pop(sid, None)
+    usernames.pop(sid, None)
+    logger.info("👋 Client %s disconnected. Total: %s", sid, len(connected_sids))
 
 
 @sio.on("join_room")
@@ -189,32 +258,28 @@ def join_room(
     data: JoinRoomMessage,
     server: Server,
     room_service=Depends(get_room_service),
-    user_service=Depends(get_user_service),
+    user_id: str = Depends(get_user_id),
 ):
     """Присоединиться к комнате с валидацией."""
-    print(f"🏠 {sid} wants to join room: {data.room}")
-
-    # Mock user ID (в реальном приложении получаем из аутентификации)
-    user_id = f"user_{sid[:8]}"
+    logger.debug("🏠 %s wants to join room: %s", sid, data.room)
 
     # Присоединяемся к комнате
-    room_service.join_room(data.room, user_id)
+    members_count = room_service.join_room(data.room, user_id)
     server.enter_room(sid, data.room)
 
-    # Получаем участников комнаты
-    members = room_service.get_room_members(data.room)
+    emit = server.emit
 
     # Уведомляем участников комнаты
-    server.emit(
+    emit(
         "user_joined",
-        {"user_id": user_id, "room": data.room, "members_count": len(members)},
+        {"user_id": user_id, "room": data.room, "members_count": members_count},
         room=data.room,
     )
 
     # Подтверждаем пользователю
-    server.emit(
+    emit(
         "joined_room",
-        {"room": data.room, "members_count": len(members), "status": "success"},
+        {"room": data.room, "members_count": members_count, "status": "success"},
         to=sid,
     )
 
@@ -224,22 +289,21 @@ def send_message(
     sid: SocketID,
     data: SendMessage,
     server: Server,
-    user_service=Depends(get_user_service),
     room_service=Depends(get_room_service),
+    user_id: str = Depends(get_user_id),
     config: AppConfig = Depends("config"),  # Используем зарегистрированную зависимость
 ):
     """Отправить сообщение в комнату с валидацией."""
-    print(f"💬 {sid} sending message to {data.room}: {data.message}")
+    logger.debug("💬 %s sending message to %s: %s", sid, data.room, data.message)
 
-    # Mock user ID
-    user_id = f"user_{sid[:8]}"
+    # Имя пользователя было получено при подключении
+    username = usernames[sid]
 
-    # Получаем информацию о пользователе
-    user = user_service.get_user(user_id)
-    username = user.username if user else f"Anonymous_{sid[:8]}"
+    # Время в целых миллисекундах, одно значение на сообщение
+    now_ms = time.time_ns() // 1_000_000
 
     # Добавляем сообщение в историю
-    room_service.add_message(data.room, data.message, username)
+    room_service.add_message(data.room, data.message, username, now_ms)
 
     # Отправляем сообщение в комнату
     server.emit(
@@ -249,48 +313,62 @@ def send_message(
             "message": data.message,
             "user_id": user_id,
             "username": username,
-            "timestamp": data.timestamp or time.time(),
+            "timestamp": int(data.timestamp * 1000) if data.timestamp else now_ms,
         },
         room=data.room,
     )
 
 
+# Ошибки, которые получает клиент, если запрос не прошёл валидацию
+REQUEST_ERRORS = {
+    "get_profile": "user_id required",
+    "get_room_history": "room required",
+}
+
+
+@sio.exception_handler(ValueError)
+def invalid_request(sid: SocketID, event: Event, server: Server, exc: ValueError):
+    """Сообщить клиенту о невалидном запросе get_profile/get_room_history."""
+    message = REQUEST_ERRORS.get(event)
+    if message is None or not isinstance(exc.__cause__, ValidationError):
+        raise exc
+    server.emit("error", {"message": message}, to=sid)
+
+
 @sio.on("get_profile")
 def get_profile(
-    sid: SocketID, data: Data, server: Server, user_service=Depends(get_user_service)
+    sid: SocketID,
+    data: GetProfileRequest,
+    server: Server,
+    user_service=Depends(get_user_service),
 ):
     """Получить профиль пользователя."""
-    if not isinstance(data, dict) or "user_id" not in data:
-        server.emit("error", {"message": "user_id required"}, to=sid)
-        return
-
-    user_id = data["user_id"]
-    user = user_service.get_user(user_id)
+    user = user_service.get_user(data.user_id)
 
     if user:
-        server.emit("profile", user.dict(), to=sid)
+        server.emit("profile", user.model_dump(), to=sid)
     else:
         server.emit("error", {"message": "User not found"}, to=sid)
 
 
 @sio.on("get_room_history")
 def get_room_history(
-    sid: SocketID, data: Data, server: Server, room_service=Depends(get_room_service)
+    sid: SocketID,
+    data: GetRoomHistoryRequest,
+    server: Server,
+    room_service=Depends(get_room_service),
 ):
     """Получить историю сообщений комнаты."""
-    if not isinstance(data, dict) or "room" not in data:
-        server.emit("error", {"message": "room required"}, to=sid)
-        return
-
-    room = data["room"]
+    room = data.room
     cache = room_service.cache
 
-    history = cache.get(room, [])
+    history = cache.get(room, ())
     server.emit(
         "room_history",
         {
             "room": room,
-            "messages": history[-20:],  # Последние 20 сообщений
+            # Последние 20 сообщений
+            "messages": list(islice(history, max(0, len(history) - 20), None)),
         },
         to=sid,
     )
@@ -302,7 +380,7 @@ def get_stats(sid: SocketID, server: Server, config: AppConfig = Depends(get_con
     server.emit(
         "stats",
         {
-            "connected_clients": connection_count,
+            "connected_clients": len(connected_sids),
             "max_connections": config.max_connections,
             "server_type": "synchronous",
             "features": [
@@ -317,6 +395,8 @@ def get_stats(sid: SocketID, server: Server, config: AppConfig = Depends(get_con
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
     print("🚀 Starting Synchronous SocketIO Server with Full Features...")
     print("📚 Available events:")
     print("  - join_room: Join a chat room")
@@ -8,6 +8,8 @@ from pydantic import BaseModel
 
 # Конфигурация
 class Config:
+    __slots__ = ("app_name", "version")
+
     def __init__(self):
         self.app_name = "Simple Sync Server"
         self.version = "1.0.0"
@@ -19,6 +21,8 @@ def get_config():
 
 # Простой сервис
 class MessageService:
+    __slots__ = ("message_count",)
+
     def __init__(self):
         self.message_count = 0
 
@@ -1,16 +1,15 @@
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
 from .asgi import ASGIApp
-from .async_aiopika_manager import AsyncAioPikaManager
 from .async_client import AsyncClient
 from .async_manager import AsyncManager
 from .async_namespace import AsyncClientNamespace, AsyncNamespace
-from .async_redis_manager import AsyncRedisManager
 from .async_server import AsyncServer
 from .async_simple_client import AsyncSimpleClient
 from .asyncapi import AsyncAPIConfig
 from .client import Client
 from .dependency import Depends, register_dependency
-from .kafka_manager import KafkaManager
-from .kombu_manager import KombuManager
 from .manager import Manager
 from .middleware import Middleware, WSGIApp
 from .middlewares import (
@@ -23,13 +22,47 @@ from .middlewares import (
 )
 from .namespace import ClientNamespace, Namespace
 from .pubsub_manager import PubSubManager
-from .redis_manager import RedisManager
 from .router import RouterSIO
 from .server import Server
 from .simple_client import SimpleClient
-from .tornado import get_tornado_handler
-from .types import Auth, Data, Environ, Event, Reason, SocketID
-from .zmq_manager import ZmqManager
+from .types import Auth, Data, DictData, Environ, Event, Reason, SocketID
+
+# Only for type checkers, at runtime these are resolved by __getattr__
+if TYPE_CHECKING:
+    from .async_aiopika_manager import AsyncAioPikaManager  # noqa: TC004
+    from .async_redis_manager import AsyncRedisManager  # noqa: TC004
+    from .kafka_manager import KafkaManager  # noqa: TC004
+    from .kombu_manager import KombuManager  # noqa: TC004
+    from .redis_manager import RedisManager  # noqa: TC004
+    from .tornado import get_tornado_handler  # noqa: TC004
+    from .zmq_manager import ZmqManager  # noqa: TC004
+
+# Message queue backends and the Tornado integration pull in optional
+# third-party packages, so they are only imported on first access.
+_lazy_imports = {
+    "AsyncAioPikaManager": ".async_aiopika_manager",
+    "AsyncRedisManager": ".async_redis_manager",
+    "KafkaManager": ".kafka_manager",
+    "KombuManager": ".kombu_manager",
+    "RedisManager": ".redis_manager",
+    "ZmqManager": ".zmq_manager",
+    "get_tornado_handler": ".tornado",
+}
+
+
+def __getattr__(name: str) -> Any:  # noqa: ANN401
+    module = _lazy_imports.get(name)
+    if module is None:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_lazy_imports))
+
 
 __all__ = [
     "ASGIApp",
@@ -48,6 +81,7 @@ __all__ = [
     "ClientNamespace",
     "Data",
     "Depends",
+    "DictData",
     "Environ",
     "Event",
     "KafkaManager",
@@ -162,7 +162,9 @@ class ASGIApp(_BaseASGIApp):  # pragma: no cover
 
         gen = AsyncAPIGenerator(self._fastsio_server.asyncapi_config)
         payload = gen.generate(self._fastsio_server)
-        text = yaml.safe_dump(payload, sort_keys=False)
+        # Prefer the libyaml-backed dumper when PyYAML was built with it
+        dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+        text = yaml.dump(payload, Dumper=dumper, sort_keys=False)
         body = text.encode("utf-8")
         await send(
             {
@@ -52,14 +52,13 @@ class AsyncManager(BaseManager):
             if not isinstance(encoded_packet, list):
                 encoded_packet = [encoded_packet]
             eio_pkt = [eio_packet.Packet(eio_packet.MESSAGE, p) for p in encoded_packet]
+            send_eio_packet = self.server._send_eio_packet
+            create_task = asyncio.create_task
+            skip = frozenset(skip_sid)
             for sid, eio_sid in self.get_participants(namespace, room):
-                if sid not in skip_sid:
+                if sid not in skip:
                     for p in eio_pkt:
-                        tasks.append(
-                            asyncio.create_task(
-                                self.server._send_eio_packet(eio_sid, p)
-                            )
-                        )
+                        tasks.append(create_task(send_eio_packet(eio_sid, p)))
         else:
             # callbacks are used, so each recipient must be sent a packet that
             # contains a unique callback id
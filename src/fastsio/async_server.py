@@ -1,5 +1,4 @@
 import asyncio
-import inspect
 from collections.abc import Coroutine
 
 # pyright: reportMissingImports=false, reportUnknownMemberType=false, reportUnknownArgumentType=false, reportUnknownVariableType=false, reportUnknownParameterType=false
@@ -18,7 +17,7 @@ from typing import (
 import engineio
 
 from . import async_manager, base_server, exceptions, packet
-from .dependency import run_with_context
+from .dependency import get_plan, run_with_context
 
 if TYPE_CHECKING:  # pragma: no cover
     from .async_admin import InstrumentedAsyncServer
@@ -863,65 +862,7 @@ class AsyncServer(base_server.BaseServer):
                     )
                 else:
                     # Use ContextVar-based dependency injection
-                    from .types import (
-                        Auth as _AuthType,
-                        Data as _DataType,
-                        Environ as _EnvironType,
-                        Event as _EventType,
-                        Reason as _ReasonType,
-                        SocketID as _SocketIDType,
-                    )
-
-                    def _uses_di(fn: Any) -> bool:
-                        try:
-                            sig_local = inspect.signature(fn)
-                        except Exception:
-                            return False
-                        try:
-                            from .dependency import Depends as _Depends  # type: ignore
-                        except Exception:
-                            _Depends = None  # type: ignore
-                        try:
-                            from pydantic import (  # type: ignore
-                                BaseModel as _PydanticBaseModel,
-                            )
-                        except Exception:
-                            _PydanticBaseModel = None  # type: ignore
-                        for _p in sig_local.parameters.values():
-                            if _p.name in {
-                                "socket_id",
-                                "environ",
-                                "auth",
-                                "reason",
-                                "data",
-                                "event",
-                            }:
-                                return True
-                            if (
-                                _p.default is not inspect._empty
-                                and _Depends is not None
-                                and isinstance(_p.default, _Depends)
-                            ):
-                                return True
-                            ann = _p.annotation
-                            if ann in (
-                                _SocketIDType,
-                                _EnvironType,
-                                _AuthType,
-                                _ReasonType,
-                                _DataType,
-                                _EventType,
-                            ):
-                                return True
-                            if (
-                                _PydanticBaseModel is not None
-                                and isinstance(ann, type)
-                                and issubclass(ann, _PydanticBaseModel)
-                            ):
-                                return True
-                        return False
-
-                    di_mode = _uses_di(handler)
+                    di_mode = get_plan(handler).uses_di
 
                     ret = await run_with_context(
                         handler,
@@ -254,19 +254,14 @@ class AsyncAPIGenerator:
             from .types import (  # type: ignore
                 Auth,
                 Data,
+                DictData,
                 Environ,
                 Event,
                 Reason,
                 SocketID,
             )
         except Exception:  # pragma: no cover
-            _AsyncServerType = object  # type: ignore
-            SocketID = object  # type: ignore
-            Environ = object  # type: ignore
-            Auth = object  # type: ignore
-            Reason = object  # type: ignore
-            Data = object  # type: ignore
-            Event = object  # type: ignore
+            return (object,) * 8
         return (
             _AsyncServerType,
             SocketID,
@@ -274,6 +269,7 @@ class AsyncAPIGenerator:
             Auth,
             Reason,
             Data,
+            DictData,
             Event,
         )
 
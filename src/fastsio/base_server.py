@@ -1,4 +1,6 @@
 import logging
+import sys
+from contextlib import suppress
 
 # pyright: reportMissingImports=false
 from typing import (
@@ -20,10 +22,54 @@ import engineio
 
 from . import base_namespace, manager, packet
 from .asyncapi import AsyncAPIConfig
+from .dependency import check_plan_event, get_model_validator, get_plan
 from .router import RouterSIO
 
+try:
+    from pydantic import BaseModel as _PydanticBaseModel
+except ImportError:  # pragma: no cover
+    _PydanticBaseModel = None
+
 default_logger = logging.getLogger("fastsio.server")
 
+_Validator = Optional[Callable[[Any], Any]]
+
+
+def _response_validator(model: object) -> _Validator:
+    """Return the validator of a Pydantic response model, or None."""
+    if (
+        _PydanticBaseModel is not None
+        and isinstance(model, type)
+        and issubclass(model, _PydanticBaseModel)
+    ):
+        return get_model_validator(model)
+    return None
+
+
+def _get_response_validators(
+    handler: Callable[..., Any], response_model: object
+) -> Union[_Validator, dict[str, _Validator]]:
+    """Return the validators for ``response_model``, looking them up only once.
+
+    The result is a validator (or None) for a single response model, or a
+    dict of them keyed by event name when ``response_model`` is a dict.
+    """
+    cached = getattr(handler, "_fastsio_response_validators", None)
+    # Handlers such as mocks may return anything for unknown attributes
+    if isinstance(cached, tuple) and len(cached) == 2 and cached[0] is response_model:
+        return cached[1]
+    if isinstance(response_model, dict):
+        validators = {
+            event_name: _response_validator(model)
+            for event_name, model in response_model.items()
+        }
+    else:
+        validators = _response_validator(response_model)
+    # bound methods do not accept new attributes
+    with suppress(AttributeError, TypeError):
+        handler._fastsio_response_validators = (response_model, validators)
+    return validators
+
 
 class BaseServer:
     reserved_events: List[str] = ["connect", "disconnect"]
@@ -183,7 +229,7 @@ class BaseServer:
           the event name as first argument and the namespace as second
           argument, followed by any arguments specific to the event.
         """
-        namespace = namespace or "/"
+        namespace = sys.intern(namespace or "/")
 
         def set_handler(handler: Callable[..., Any]) -> Callable[..., Any]:
             if namespace not in self.handlers:
@@ -224,7 +270,9 @@ class BaseServer:
                     handler._fastsio_channel_override = channel
                 except Exception:
                     pass
-            self.handlers[namespace][event] = handler
+            # Analyse the signature once so that dispatch doesn't have to
+            check_plan_event(get_plan(handler), event)
+            self.handlers[namespace][sys.intern(event)] = handler
             return handler
 
         if handler is None:
@@ -316,6 +364,8 @@ class BaseServer:
         """
         # function-based
         for ns, event, handler, exception_handlers in router.iter_function_handlers():
+            # Composed namespaces are new strings, intern them like in on()
+            ns = sys.intern(ns)
             if ns not in self.handlers:
                 self.handlers[ns] = {}
             if exception_handlers:
@@ -386,27 +436,31 @@ class BaseServer:
         exception_handlers: Optional[
             Dict[Type[BaseException], Callable[..., Any]]
         ] = None
-        if namespace in self.handlers:
-            if event in self.handlers[namespace]:
-                handler = self.handlers[namespace][event]
+        namespace_handlers = self.handlers.get(namespace)
+        if namespace_handlers is not None:
+            handler = namespace_handlers.get(event)
+            if handler is not None:
                 exception_handlers = self.handler_exception_handlers.get(
                     namespace, {}
                 ).get(event)
-            elif event not in self.reserved_events and "*" in self.handlers[namespace]:
-                handler = self.handlers[namespace]["*"]
+            elif event not in self.reserved_events and "*" in namespace_handlers:
+                handler = namespace_handlers["*"]
                 exception_handlers = self.handler_exception_handlers.get(
                     namespace, {}
                 ).get("*")
                 args = (event, *args)
-        if handler is None and "*" in self.handlers:
-            if event in self.handlers["*"]:
-                handler = self.handlers["*"][event]
+        if handler is None:
+            namespace_handlers = self.handlers.get("*")
+            if namespace_handlers is None:
+                return handler, args, exception_handlers
+            if event in namespace_handlers:
+                handler = namespace_handlers[event]
                 exception_handlers = self.handler_exception_handlers.get("*", {}).get(
                     event
                 )
                 args = (namespace, *args)
-            elif event not in self.reserved_events and "*" in self.handlers["*"]:
-                handler = self.handlers["*"]["*"]
+            elif event not in self.reserved_events and "*" in namespace_handlers:
+                handler = namespace_handlers["*"]
                 exception_handlers = self.handler_exception_handlers.get("*", {}).get(
                     "*"
                 )
@@ -434,6 +488,7 @@ class BaseServer:
         response_model = getattr(handler, "_fastsio_response_model", None)
         if response_model is None:
             return response
+        validators = _get_response_validators(handler, response_model)
 
         # If response_model is a dictionary (multiple response models)
         if isinstance(response_model, dict):
@@ -454,69 +509,33 @@ class BaseServer:
                     f"Event '{event_name}' not found in response_model. Available events: {list(response_model.keys())}"
                 )
 
-            model = response_model[event_name]
-
-            # Validate data against the model
-            try:
-                # Import Pydantic BaseModel locally to avoid import issues
-                from pydantic import BaseModel as _PydanticBaseModel
-
-                if isinstance(model, type) and issubclass(model, _PydanticBaseModel):
-                    # Validate using Pydantic
-                    if hasattr(model, "model_validate"):
-                        # Pydantic v2
-                        if isinstance(data, model):
-                            validated_data = data
-                        else:
-                            validated_data = model.model_validate(data)
-                    else:
-                        # Pydantic v1 fallback
-                        if isinstance(data, model):
-                            validated_data = data
-                        else:
-                            validated_data = model.parse_obj(data)  # type: ignore[attr-defined]
-
-                    # Return the tuple with validated data
-                    return (event_name, validated_data) + extra_args
+            validator = validators[event_name]
+            if validator is None:
                 # Not a Pydantic model, return as is
                 return response
 
-            except ImportError:
-                # Pydantic not available, skip validation
-                return response
+            # Validate data against the model
+            try:
+                if isinstance(data, response_model[event_name]):
+                    validated_data = data
+                else:
+                    validated_data = validator(data)
             except Exception as exc:
                 raise ValueError(
                     f"Failed to validate response data for event '{event_name}': {exc}"
                 ) from exc
 
-        else:
-            # Single response model (existing behavior)
-            try:
-                from pydantic import BaseModel as _PydanticBaseModel
-
-                if isinstance(response_model, type) and issubclass(
-                    response_model, _PydanticBaseModel
-                ):
-                    # Validate using Pydantic
-                    if hasattr(response_model, "model_validate"):
-                        # Pydantic v2
-                        if isinstance(response, response_model):
-                            return response
-                        return response_model.model_validate(response)
-                    # Pydantic v1 fallback
-                    if isinstance(response, response_model):
-                        return response
-                    return response_model.parse_obj(response)  # type: ignore[attr-defined]
-                # Not a Pydantic model, return as is
-                return response
-
-            except ImportError:
-                # Pydantic not available, skip validation
-                return response
-            except Exception as exc:
-                raise ValueError(f"Failed to validate response data: {exc}") from exc
+            # Return the tuple with validated data
+            return (event_name, validated_data) + extra_args
 
-        return response
+        # Single response model (existing behavior)
+        if validators is None or isinstance(response, response_model):
+            # Not a Pydantic model or already validated, return as is
+            return response
+        try:
+            return validators(response)
+        except Exception as exc:
+            raise ValueError(f"Failed to validate response data: {exc}") from exc
 
     def _get_exception_handler(
         self,
@@ -565,15 +584,14 @@ class BaseServer:
             namespace: Specific namespace to apply middleware to (overrides middleware's own namespace)
             global_middleware: If True, this middleware runs for all events regardless of namespace
         """
+        from .middlewares import _make_event_filter
+
         # Override middleware settings if provided
         if events is not None:
-            if isinstance(events, str):
-                middleware.events = {events}
-            else:
-                middleware.events = set(events)
+            middleware.events = _make_event_filter(events)
 
         if namespace is not None:
-            middleware.namespace = namespace
+            middleware.namespace = sys.intern(namespace)
 
         if global_middleware:
             middleware.global_middleware = True
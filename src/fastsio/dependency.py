@@ -6,22 +6,64 @@ using Python's ContextVar for managing request-scoped dependencies.
 
 import asyncio
 import inspect
-from contextvars import ContextVar, copy_context
-from typing import Any, Callable, Dict, Optional, TypeVar, Union, get_args, get_origin
+from collections.abc import Container
+from contextlib import suppress
+from contextvars import ContextVar, Token
+from operator import attrgetter
+from typing import Any, Callable, Optional, TypeVar, Union, get_args, get_origin
+from weakref import WeakKeyDictionary
+
+from .types import Auth, Data, DictData, Environ, Event, Reason, SocketID
+
+try:
+    from pydantic import BaseModel as _PydanticBaseModel
+except ImportError:  # pragma: no cover
+    _PydanticBaseModel = None
+
+
+class _Frame:
+    """Values available to dependency resolution while an event is handled."""
+
+    __slots__ = (
+        "auth",
+        "data",
+        "dependency_cache",
+        "environ",
+        "event",
+        "reason",
+        "server",
+        "socket_id",
+    )
+
+    def __init__(
+        self,
+        socket_id: Optional[str] = None,
+        environ: Optional[dict] = None,
+        auth: Optional[dict] = None,
+        reason: Optional[str] = None,
+        data: object = None,
+        event: Optional[str] = None,
+        server: object = None,
+        dependency_cache: Optional[dict[int, Any]] = None,
+    ) -> None:
+        self.socket_id = socket_id
+        self.environ = environ
+        self.auth = auth
+        self.reason = reason
+        self.data = data
+        self.event = event
+        self.server = server
+        # Results of Depends() factories resolved while handling the event
+        self.dependency_cache = dependency_cache
 
-from .types import Auth, Data, Environ, Event, Reason, SocketID
 
-# Context variables for built-in dependencies
-_socket_id: ContextVar[Optional[str]] = ContextVar("socket_id", default=None)
-_environ: ContextVar[Optional[dict]] = ContextVar("environ", default=None)
-_auth: ContextVar[Optional[dict]] = ContextVar("auth", default=None)
-_reason: ContextVar[Optional[str]] = ContextVar("reason", default=None)
-_data: ContextVar[Any] = ContextVar("data", default=None)
-_event: ContextVar[Optional[str]] = ContextVar("event", default=None)
-_server: ContextVar[Any] = ContextVar("server", default=None)
+# A single context variable holds the frame of the event being handled, so
+# entering and leaving a dispatch is one set() and one reset(). Frames are
+# only ever set through _push_frame(), which returns the token to reset.
+_frame: ContextVar[Optional[_Frame]] = ContextVar("fastsio_frame", default=None)
 
 # Registry for custom dependencies
-_dependency_registry: Dict[str, Callable] = {}
+_dependency_registry: dict[str, Callable] = {}
 
 T = TypeVar("T")
 
@@ -36,16 +78,26 @@ class Depends:
         @sio.event
         async def handle_event(sid: SocketID, db: Database = Depends(get_database)):
             pass
+
+    ``dependency`` can also be the name of a factory registered with
+    ``register_dependency()``.
     """
 
-    def __init__(self, dependency: Callable[..., T], use_cache: bool = True):
+    def __init__(
+        self, dependency: Union[Callable[..., T], str], use_cache: bool = True
+    ):
         self.dependency = dependency
         self.use_cache = use_cache
-        self._cache_key = f"_dep_cache_{id(dependency)}"
+        # Results are cached per event under the identity of the factory
+        self._cache_key = id(dependency)
 
 
 def register_dependency(name: str, factory: Callable) -> None:
-    """Register a global dependency factory."""
+    """Register a global dependency factory.
+
+    Handlers registered after this call resolve ``Depends(name)`` to
+    ``factory`` once, when their plan is built.
+    """
     _dependency_registry[name] = factory
 
 
@@ -54,9 +106,29 @@ def get_dependency(name: str) -> Optional[Callable]:
     return _dependency_registry.get(name)
 
 
+def _named_dependency(marker: Depends) -> Depends:
+    """Turn a ``Depends("name")`` marker into one for the registered factory."""
+    factory = _dependency_registry.get(marker.dependency)
+    if factory is None:
+        msg = f"Dependency '{marker.dependency}' is not registered"
+        raise ValueError(msg)
+    return Depends(factory, use_cache=marker.use_cache)
+
+
 class DependencyContext:
     """Context manager for setting up dependency injection context."""
 
+    __slots__ = (
+        "_token",
+        "auth",
+        "data",
+        "environ",
+        "event",
+        "reason",
+        "server",
+        "socket_id",
+    )
+
     def __init__(
         self,
         socket_id: Optional[str] = None,
@@ -74,31 +146,302 @@ class DependencyContext:
         self.data = data
         self.event = event
         self.server = server
-        self._tokens = []
+        self._token = None
 
     def __enter__(self):
-        if self.socket_id is not None:
-            self._tokens.append(_socket_id.set(self.socket_id))
-        if self.environ is not None:
-            self._tokens.append(_environ.set(self.environ))
-        if self.auth is not None:
-            self._tokens.append(_auth.set(self.auth))
-        if self.reason is not None:
-            self._tokens.append(_reason.set(self.reason))
-        if self.data is not None:
-            self._tokens.append(_data.set(self.data))
-        if self.event is not None:
-            self._tokens.append(_event.set(self.event))
-        if self.server is not None:
-            self._tokens.append(_server.set(self.server))
+        self._token = _push_frame(
+            self.socket_id,
+            self.environ,
+            self.auth,
+            self.reason,
+            self.data,
+            self.event,
+            self.server,
+        )
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        for token in reversed(self._tokens):
-            token.var.reset(token)
+        _frame.reset(self._token)
+
+
+def _push_frame(
+    socket_id: Optional[str],
+    environ: Optional[dict],
+    auth: Optional[dict],
+    reason: Optional[str],
+    data: object,
+    event: Optional[str],
+    server: object,
+) -> Token:
+    """Make a new frame current and return the token that restores the old one.
+
+    Values left as ``None`` are inherited from the enclosing frame, if any.
+    A nested frame that changes nothing belongs to the same event, so the
+    enclosing frame is reused together with its dependency cache.
+    """
+    parent = _frame.get()
+    if parent is not None:
+        # Nested inside another context
+        if socket_id is None:
+            socket_id = parent.socket_id
+        if environ is None:
+            environ = parent.environ
+        if auth is None:
+            auth = parent.auth
+        if reason is None:
+            reason = parent.reason
+        if data is None:
+            data = parent.data
+        if event is None:
+            event = parent.event
+        if server is None:
+            server = parent.server
+        if (
+            socket_id is parent.socket_id
+            and environ is parent.environ
+            and auth is parent.auth
+            and reason is parent.reason
+            and data is parent.data
+            and event is parent.event
+            and server is parent.server
+        ):
+            return _frame.set(parent)
+    # Every event gets a fresh cache shared by all its nested Depends()
+    return _frame.set(_Frame(socket_id, environ, auth, reason, data, event, server, {}))
+
+
+# Kinds of plan steps, see ``HandlerPlan``. The target of a getter step is a
+# callable that reads the value from the current frame, which covers the
+# built-in types as well as Pydantic models, so the most common parameters
+# are handled by the first branch of the resolvers.
+_STEP_GETTER = 0
+_STEP_DEPENDS = 1
+_STEP_AUTH = 2
+_STEP_REASON = 3
+
+_DI_PARAM_NAMES = frozenset({"socket_id", "environ", "auth", "reason", "data", "event"})
+
+
+class HandlerPlan:
+    """Precomputed dependency resolution plan for a callable.
+
+    The signature of a handler is inspected once, when the handler is
+    registered, and turned into a tuple of ``(param_name, kind, target)``
+    steps. Resolving dependencies for an event then only walks this tuple
+    instead of re-inspecting the signature on every dispatch. Whether the
+    callable is a coroutine function is recorded as well.
+    """
+
+    __slots__ = ("is_async", "names", "positional", "steps", "uses_di")
+
+    def __init__(
+        self,
+        names: tuple[str, ...],
+        positional: tuple[str, ...],
+        steps: tuple[tuple[str, int, Any], ...],
+        uses_di: bool,
+        is_async: bool = False,
+    ) -> None:
+        """Store the parameter names, positional names and steps of a plan."""
+        self.names = names
+        self.positional = positional
+        self.steps = steps
+        self.uses_di = uses_di
+        self.is_async = is_async
+
+
+def _dict_data(frame: _Frame) -> dict:
+    data = frame.data
+    return data if isinstance(data, dict) else {}
+
+
+def _is_optional_of(annotation: object, target: object) -> bool:
+    return annotation is target or (
+        get_origin(annotation) is Union and target in get_args(annotation)
+    )
+
+
+def build_plan(func: Callable) -> HandlerPlan:
+    """Inspect the signature of ``func`` and compile its resolution plan."""
+    try:
+        sig = inspect.signature(func)
+    except (TypeError, ValueError):
+        return HandlerPlan((), (), (), False, asyncio.iscoroutinefunction(func))
+
+    try:
+        from .async_server import AsyncServer as _AsyncServerType
+    except ImportError:
+        _AsyncServerType = None
+    try:
+        from .server import Server as _SyncServerType
+    except ImportError:
+        _SyncServerType = None
+
+    builtins = {
+        SocketID: attrgetter("socket_id"),
+        Environ: attrgetter("environ"),
+        Data: attrgetter("data"),
+        DictData: _dict_data,
+        Event: attrgetter("event"),
+    }
+    if _AsyncServerType is not None:
+        builtins[_AsyncServerType] = attrgetter("server")
+    if _SyncServerType is not None:
+        builtins[_SyncServerType] = attrgetter("server")
+
+    names = []
+    positional = []
+    steps = []
+    uses_di = False
+    collect_positional = True
+    for param_name, param in sig.parameters.items():
+        names.append(param_name)
+        if param.kind == inspect.Parameter.VAR_POSITIONAL:
+            collect_positional = False
+        elif collect_positional and param.kind in (
+            inspect.Parameter.POSITIONAL_ONLY,
+            inspect.Parameter.POSITIONAL_OR_KEYWORD,
+        ):
+            positional.append(param_name)
+        if param_name in _DI_PARAM_NAMES:
+            uses_di = True
+
+        annotation = param.annotation
 
+        # Depends() markers take precedence over the annotation
+        if isinstance(param.default, Depends):
+            marker = param.default
+            if (
+                isinstance(marker.dependency, str)
+                and marker.dependency in _dependency_registry
+            ):
+                # Look named dependencies up once instead of on every event
+                marker = _named_dependency(marker)
+            steps.append((param_name, _STEP_DEPENDS, marker))
+            uses_di = True
+            continue
+
+        if annotation is inspect.Parameter.empty:
+            continue
+
+        if annotation in (SocketID, Environ, Auth, Reason, Data, DictData, Event):
+            uses_di = True
+
+        try:
+            getter = builtins.get(annotation)
+        except TypeError:  # unhashable annotation
+            getter = None
+        if getter is not None:
+            steps.append((param_name, _STEP_GETTER, getter))
+            continue
+
+        if _is_optional_of(annotation, Auth):
+            steps.append((param_name, _STEP_AUTH, None))
+            continue
+
+        if _is_optional_of(annotation, Reason):
+            steps.append((param_name, _STEP_REASON, None))
+            continue
+
+        if (
+            _PydanticBaseModel is not None
+            and isinstance(annotation, type)
+            and issubclass(annotation, _PydanticBaseModel)
+        ):
+            steps.append((param_name, _STEP_GETTER, _model_getter(annotation)))
+            uses_di = True
+            continue
+
+    return HandlerPlan(
+        tuple(names),
+        tuple(positional),
+        tuple(steps),
+        uses_di,
+        asyncio.iscoroutinefunction(func),
+    )
+
+
+def get_model_validator(model: type) -> Callable[[Any], Any]:
+    """Return the fastest validation callable available for a Pydantic model.
+
+    For fully built Pydantic v2 models this is the pydantic-core validator,
+    which skips the Python-level ``model_validate`` wrapper.
+    """
+    if model.__pydantic_complete__:
+        return model.__pydantic_validator__.validate_python
+    # Models that still need a rebuild go through model_validate, which
+    # rebuilds them on first use
+    return model.model_validate
 
-async def resolve_dependencies(func: Callable, **explicit_kwargs) -> Dict[str, Any]:
+
+def check_plan_event(plan: HandlerPlan, event: str) -> None:
+    """Reject a handler for ``event`` that asks for values it never gets.
+
+    ``Auth`` is only set for ``connect`` and ``Reason`` only for
+    ``disconnect``, so misuse is reported when the handler is registered.
+    Dependencies and exception handlers are still checked when resolved.
+    """
+    for _, kind, _ in plan.steps:
+        if kind == _STEP_AUTH and event != "connect":
+            raise ValueError(
+                f"Auth is only available in connect handler, not in '{event}'"
+            )
+        if kind == _STEP_REASON and event != "disconnect":
+            raise ValueError(
+                f"Reason is only available in disconnect handler, not in '{event}'"
+            )
+
+
+# Plans of callables that do not accept new attributes, such as bound methods
+_plan_cache: "WeakKeyDictionary[Callable, HandlerPlan]" = WeakKeyDictionary()
+
+
+def get_plan(func: Callable) -> HandlerPlan:
+    """Return the resolution plan of ``func``, building it on first use.
+
+    The plan is stored on the function itself so that it is computed once
+    per handler, normally at registration time. Callables that do not
+    accept new attributes keep their plan in a weak cache instead, for as
+    long as they are alive.
+    """
+    plan = getattr(func, "_fastsio_plan", None)
+    if isinstance(plan, HandlerPlan):
+        return plan
+    try:
+        return _plan_cache[func]
+    except (KeyError, TypeError):
+        pass
+    plan = build_plan(func)
+    try:
+        func._fastsio_plan = plan
+    except (AttributeError, TypeError):
+        # TypeError: not hashable or not weakly referenceable
+        with suppress(TypeError):
+            _plan_cache[func] = plan
+    return plan
+
+
+def _model_getter(model: type) -> Callable[[_Frame], object]:
+    """Return a getter that validates the event payload against ``model``."""
+    validator = get_model_validator(model)
+
+    def get(frame: _Frame) -> object:
+        data = frame.data
+        if data is None:
+            raise ValueError(
+                f"Cannot inject Pydantic model '{model.__name__}': no data available"
+            )
+        try:
+            return validator(data)
+        except Exception as exc:
+            raise ValueError(
+                f"Failed to validate payload for '{model.__name__}': {exc}"
+            ) from exc
+
+    return get
+
+
+async def resolve_dependencies(func: Callable, **explicit_kwargs) -> dict[str, Any]:
     """Resolve dependencies for a function based on its signature and context variables.
 
     Args:
@@ -111,150 +454,98 @@ async def resolve_dependencies(func: Callable, **explicit_kwargs) -> Dict[str, A
     if not callable(func):
         return {}
 
-    sig = inspect.signature(func)
-    resolved = {}
-    dependency_cache = getattr(asyncio.current_task(), "_dependency_cache", None)
-    if dependency_cache is None:
-        dependency_cache = {}
-        asyncio.current_task()._dependency_cache = dependency_cache
+    plan = get_plan(func)
+    # Dispatch normally passes no explicit kwargs, skip filtering them then
+    resolved = (
+        {name: explicit_kwargs[name] for name in plan.names if name in explicit_kwargs}
+        if explicit_kwargs
+        else {}
+    )
+    if not plan.steps:
+        return resolved
+    return await _resolve_steps(plan.steps, _current_frame(), resolved, explicit_kwargs)
+
+
+async def _resolve_steps(
+    steps: tuple[tuple[str, int, Any], ...],
+    frame: _Frame,
+    resolved: dict[str, Any],
+    explicit_kwargs: Container[str] = (),
+) -> dict[str, Any]:
+    """Run the steps of a plan, resolving nested dependencies in place.
+
+    Nested dependencies reuse the frame that was looked up for the handler
+    instead of going through ``resolve_dependencies`` again.
+    """
+    dependency_cache = frame.dependency_cache
 
-    for param_name, param in sig.parameters.items():
+    for param_name, kind, target in steps:
         # Skip if already provided explicitly
         if param_name in explicit_kwargs:
-            resolved[param_name] = explicit_kwargs[param_name]
             continue
 
-        annotation = param.annotation
-
-        # Handle Depends() dependencies first (before checking annotation)
-        if hasattr(param, "default") and isinstance(param.default, Depends):
-            dep = param.default
-            cache_key = dep._cache_key
+        if kind == _STEP_GETTER:
+            value = target(frame)
+            if value is not None:
+                resolved[param_name] = value
+        elif kind == _STEP_DEPENDS:
+            if isinstance(target.dependency, str):
+                # Registered after the plan was built
+                target = _named_dependency(target)
+            cache_key = target._cache_key
 
             # Check cache if enabled
-            if dep.use_cache and cache_key in dependency_cache:
+            if target.use_cache and cache_key in dependency_cache:
                 resolved[param_name] = dependency_cache[cache_key]
                 continue
 
-            # Resolve dependency
-            if asyncio.iscoroutinefunction(dep.dependency):
-                dep_resolved = await resolve_dependencies(dep.dependency)
-                result = await dep.dependency(**dep_resolved)
+            # Resolve dependency, factories without parameters need no
+            # arguments at all
+            dependency = target.dependency
+            dep_plan = get_plan(dependency)
+            if dep_plan.steps:
+                dep_resolved = await _resolve_steps(dep_plan.steps, frame, {})
             else:
-                dep_resolved = await resolve_dependencies(dep.dependency)
-                result = dep.dependency(**dep_resolved)
+                dep_resolved = {}
+            if dep_plan.is_async:
+                result = await dependency(**dep_resolved)
+            else:
+                result = dependency(**dep_resolved)
 
             # Cache result if enabled
-            if dep.use_cache:
+            if target.use_cache:
                 dependency_cache[cache_key] = result
 
             resolved[param_name] = result
-            continue
-
-        if annotation == inspect.Parameter.empty:
-            continue
-
-        # Handle built-in types
-        if annotation is SocketID:
-            sid = _socket_id.get()
-            if sid is not None:
-                resolved[param_name] = SocketID(sid)
-            continue
-
-        if annotation is Environ:
-            environ = _environ.get()
-            if environ is not None:
-                resolved[param_name] = Environ(environ)
-            continue
-
-        # Auth: available only in connect. Inject None if not provided by client.
-        if annotation is Auth or (
-            get_origin(annotation) is Union and Auth in get_args(annotation)
-        ):
-            current_event = _event.get()
-            if current_event != "connect":
+        elif kind == _STEP_AUTH:
+            # Auth: available only in connect. Inject None if not provided by client.
+            if frame.event != "connect":
                 raise ValueError("Auth is only available in connect handler")
-            auth = _auth.get()
+            auth = frame.auth
             resolved[param_name] = Auth(auth) if auth is not None else None
-            continue
-
-        # Reason: available only in disconnect. Inject None if absent.
-        if annotation is Reason or (
-            get_origin(annotation) is Union and Reason in get_args(annotation)
-        ):
-            current_event = _event.get()
-            if current_event != "disconnect":
+        elif kind == _STEP_REASON:
+            # Reason: available only in disconnect. Inject None if absent.
+            if frame.event != "disconnect":
                 raise ValueError("Reason is only available in disconnect handler")
-            reason = _reason.get()
+            reason = frame.reason
             resolved[param_name] = Reason(reason) if reason is not None else None
-            continue
-
-        if annotation is Data:
-            data = _data.get()
-            if data is not None:
-                resolved[param_name] = data
-            continue
-
-        if annotation is Event:
-            event = _event.get()
-            if event is not None:
-                resolved[param_name] = Event(event)
-            continue
-
-        # Handle AsyncServer injection
-        try:
-            from .async_server import AsyncServer as _AsyncServerType
-        except ImportError:
-            _AsyncServerType = None
-
-        if _AsyncServerType and annotation is _AsyncServerType:
-            server = _server.get()
-            if server is not None:
-                resolved[param_name] = server
-            continue
 
-        # Handle sync Server injection
-        try:
-            from .server import Server as _SyncServerType
-        except ImportError:
-            _SyncServerType = None
-
-        if _SyncServerType and annotation is _SyncServerType:
-            server = _server.get()
-            if server is not None:
-                resolved[param_name] = server
-            continue
-
-        # Handle Pydantic models
-        try:
-            from pydantic import BaseModel as _PydanticBaseModel
+    return resolved
 
-            is_pydantic = isinstance(annotation, type) and issubclass(
-                annotation, _PydanticBaseModel
-            )
-        except ImportError:
-            is_pydantic = False
 
-        if is_pydantic:
-            data = _data.get()
-            if data is None:
-                raise ValueError(
-                    f"Cannot inject Pydantic model '{annotation.__name__}': no data available"
-                )
+def _current_frame() -> _Frame:
+    frame = _frame.get()
+    if frame is None:
+        # Called outside of a DependencyContext, the frame only lives as long
+        # as this resolution and is never made current
+        frame = _Frame(dependency_cache={})
+    return frame
 
-            try:
-                # Pydantic v2: model_validate
-                if hasattr(annotation, "model_validate"):
-                    resolved[param_name] = annotation.model_validate(data)
-                else:  # Pydantic v1 fallback
-                    resolved[param_name] = annotation.parse_obj(data)
-            except Exception as exc:
-                raise ValueError(
-                    f"Failed to validate payload for '{annotation.__name__}': {exc}"
-                ) from exc
-            continue
 
-    return resolved
+def _drop_positional(plan: HandlerPlan, resolved: dict[str, Any], nargs: int) -> None:
+    # Remove resolved entries that will be satisfied by positional args
+    for name in plan.positional[:nargs]:
+        resolved.pop(name, None)
 
 
 async def run_with_context(
@@ -273,194 +564,103 @@ async def run_with_context(
 
     This is the main entry point for executing handlers with DI.
     """
-    if asyncio.iscoroutinefunction(func):
-        with DependencyContext(
-            socket_id=socket_id,
-            environ=environ,
-            auth=auth,
-            reason=reason,
-            data=data,
-            event=event,
-            server=server,
-        ):
+    plan = get_plan(func)
+    # The frame is set and reset around the call, so there is no need to
+    # snapshot the whole context with copy_context(). Handlers with nothing
+    # to inject never read it, so they skip it entirely.
+    token = (
+        _push_frame(socket_id, environ, auth, reason, data, event, server)
+        if plan.steps
+        else None
+    )
+    try:
+        if plan.is_async:
             # Resolve dependencies and avoid duplicates for positionals
-            sig = inspect.signature(func)
             resolved = await resolve_dependencies(func, **kwargs)
-            resolved.update(kwargs)  # Explicit kwargs take precedence
-            # Remove any resolved entries that are satisfied by positional args
-            consumed = 0
-            for name, param in sig.parameters.items():
-                if param.kind in (
-                    inspect.Parameter.POSITIONAL_ONLY,
-                    inspect.Parameter.POSITIONAL_OR_KEYWORD,
-                ) and consumed < len(args):
-                    if name in resolved:
-                        resolved.pop(name)
-                    consumed += 1
-                elif param.kind == inspect.Parameter.VAR_POSITIONAL:
-                    # *args collects remaining positionals; stop consuming by name
-                    break
-            return await func(*args, **resolved)
-    else:
-        # Create a new context and run the sync function
-        ctx = copy_context()
-
-        def _sync_run():
-            with DependencyContext(
-                socket_id=socket_id,
-                environ=environ,
-                auth=auth,
-                reason=reason,
-                data=data,
-                event=event,
-                server=server,
-            ):
-                sig = inspect.signature(func)
-                resolved = _resolve_sync_dependencies(func, **kwargs)
+            if kwargs:
+                # Explicit kwargs take precedence, including those that only
+                # a **kwargs parameter accepts
                 resolved.update(kwargs)
-                consumed = 0
-                for name, param in sig.parameters.items():
-                    if param.kind in (
-                        inspect.Parameter.POSITIONAL_ONLY,
-                        inspect.Parameter.POSITIONAL_OR_KEYWORD,
-                    ) and consumed < len(args):
-                        if name in resolved:
-                            resolved.pop(name)
-                        consumed += 1
-                    elif param.kind == inspect.Parameter.VAR_POSITIONAL:
-                        break
-                return func(*args, **resolved)
-
-        return ctx.run(_sync_run)
-
-
-def _resolve_sync_dependencies(func: Callable, **explicit_kwargs) -> Dict[str, Any]:
+            if args:
+                _drop_positional(plan, resolved, len(args))
+            return await func(*args, **resolved)
+        resolved = _resolve_sync_dependencies(func, **kwargs)
+        if kwargs:
+            resolved.update(kwargs)
+        if args:
+            _drop_positional(plan, resolved, len(args))
+        return func(*args, **resolved)
+    finally:
+        if token is not None:
+            _frame.reset(token)
+
+
+def _resolve_sync_dependencies(func: Callable, **explicit_kwargs) -> dict[str, Any]:
     """Simplified synchronous dependency resolution for sync handlers.
     Resolves built-in context variables and sync Depends().
     """
     if not callable(func):
         return {}
 
-    sig = inspect.signature(func)
-    resolved = {}
-
-    for param_name, param in sig.parameters.items():
+    plan = get_plan(func)
+    # Dispatch normally passes no explicit kwargs, skip filtering them then
+    resolved = (
+        {name: explicit_kwargs[name] for name in plan.names if name in explicit_kwargs}
+        if explicit_kwargs
+        else {}
+    )
+    if not plan.steps:
+        return resolved
+    return _resolve_sync_steps(plan.steps, _current_frame(), resolved, explicit_kwargs)
+
+
+def _resolve_sync_steps(
+    steps: tuple[tuple[str, int, Any], ...],
+    frame: _Frame,
+    resolved: dict[str, Any],
+    explicit_kwargs: Container[str] = (),
+) -> dict[str, Any]:
+    """Synchronous counterpart of ``_resolve_steps``."""
+    dependency_cache = frame.dependency_cache
+
+    for param_name, kind, target in steps:
         # Skip if already provided explicitly
         if param_name in explicit_kwargs:
-            resolved[param_name] = explicit_kwargs[param_name]
             continue
 
-        annotation = param.annotation
-
-        # Handle Depends() dependencies first (before checking annotation)
-        if hasattr(param, "default") and isinstance(param.default, Depends):
-            dep = param.default
+        if kind == _STEP_GETTER:
+            value = target(frame)
+            if value is not None:
+                resolved[param_name] = value
+        elif kind == _STEP_DEPENDS:
+            if isinstance(target.dependency, str):
+                # Registered after the plan was built
+                target = _named_dependency(target)
+            cache_key = target._cache_key
+            if target.use_cache and cache_key in dependency_cache:
+                resolved[param_name] = dependency_cache[cache_key]
+                continue
 
             # For sync dependencies, resolve recursively
-            if not inspect.iscoroutinefunction(dep.dependency):
-                dep_resolved = _resolve_sync_dependencies(dep.dependency)
-                result = dep.dependency(**dep_resolved)
-                resolved[param_name] = result
-            else:
+            dependency = target.dependency
+            dep_plan = get_plan(dependency)
+            if dep_plan.is_async:
                 # Can't resolve async dependencies in sync context
                 raise ValueError(
-                    f"Cannot use async dependency {dep.dependency.__name__} in sync handler"
+                    f"Cannot use async dependency {dependency.__name__} in sync handler"
                 )
-            continue
-
-        if annotation == inspect.Parameter.empty:
-            continue
-
-        # Handle built-in types
-        if annotation is SocketID:
-            sid = _socket_id.get()
-            if sid is not None:
-                resolved[param_name] = SocketID(sid)
-            continue
-
-        if annotation is Environ:
-            environ = _environ.get()
-            if environ is not None:
-                resolved[param_name] = Environ(environ)
-            continue
-
-        if annotation is Auth or (
-            get_origin(annotation) is Union and Auth in get_args(annotation)
-        ):
-            auth = _auth.get()
+            if dep_plan.steps:
+                result = dependency(**_resolve_sync_steps(dep_plan.steps, frame, {}))
+            else:
+                result = dependency()
+            if target.use_cache:
+                dependency_cache[cache_key] = result
+            resolved[param_name] = result
+        elif kind == _STEP_AUTH:
+            auth = frame.auth
             resolved[param_name] = Auth(auth) if auth is not None else None
-            continue
-
-        if annotation is Reason or (
-            get_origin(annotation) is Union and Reason in get_args(annotation)
-        ):
-            reason = _reason.get()
+        elif kind == _STEP_REASON:
+            reason = frame.reason
             resolved[param_name] = Reason(reason) if reason is not None else None
-            continue
-
-        if annotation is Data:
-            data = _data.get()
-            if data is not None:
-                resolved[param_name] = data
-            continue
-
-        if annotation is Event:
-            event = _event.get()
-            if event is not None:
-                resolved[param_name] = Event(event)
-            continue
-
-        # Handle AsyncServer injection
-        try:
-            from .async_server import AsyncServer as _AsyncServerType
-        except ImportError:
-            _AsyncServerType = None
-
-        if _AsyncServerType and annotation is _AsyncServerType:
-            server = _server.get()
-            if server is not None:
-                resolved[param_name] = server
-            continue
-
-        # Handle sync Server injection
-        try:
-            from .server import Server as _SyncServerType
-        except ImportError:
-            _SyncServerType = None
-
-        if _SyncServerType and annotation is _SyncServerType:
-            server = _server.get()
-            if server is not None:
-                resolved[param_name] = server
-            continue
-
-        # Handle Pydantic models
-        try:
-            from pydantic import BaseModel as _PydanticBaseModel
-
-            is_pydantic = isinstance(annotation, type) and issubclass(
-                annotation, _PydanticBaseModel
-            )
-        except ImportError:
-            is_pydantic = False
-
-        if is_pydantic:
-            data = _data.get()
-            if data is None:
-                raise ValueError(
-                    f"Cannot inject Pydantic model '{annotation.__name__}': no data available"
-                )
-
-            try:
-                # Pydantic v2: model_validate
-                if hasattr(annotation, "model_validate"):
-                    resolved[param_name] = annotation.model_validate(data)
-                else:  # Pydantic v1 fallback
-                    resolved[param_name] = annotation.parse_obj(data)
-            except Exception as exc:
-                raise ValueError(
-                    f"Failed to validate payload for '{annotation.__name__}': {exc}"
-                ) from exc
-            continue
 
     return resolved
@@ -5,11 +5,33 @@ and modifying Socket.IO events at various stages of processing.
 """
 
 import asyncio
+import sys
 from abc import ABC
-from typing import Any, Callable, Dict, List, Optional, Set, TypeVar, Union
+from typing import Any, Callable, Dict, List, Optional, TypeVar, Union
+
+from .dependency import get_plan
 
 T = TypeVar("T")
 
+# Stands for any event or namespace that no middleware filters on
+_UNFILTERED = object()
+
+
+def _make_event_filter(events: Optional[Union[str, list[str]]]) -> frozenset[str]:
+    """Build the ``events`` filter of a middleware.
+
+    Args:
+        events: Event name, list of event names or None for all events
+
+    Returns:
+        Frozen set of interned event names (empty means all events)
+    """
+    if events is None:
+        return frozenset()
+    if isinstance(events, str):
+        return frozenset((sys.intern(events),))
+    return frozenset(sys.intern(event) for event in events)
+
 
 class BaseMiddleware(ABC):
     """Base class for all middlewares.
@@ -19,6 +41,8 @@ class BaseMiddleware(ABC):
     2. Override __call__ method for custom control flow
     """
 
+    __slots__ = ("events", "global_middleware", "namespace")
+
     def __init__(
         self,
         events: Optional[Union[str, List[str]]] = None,
@@ -34,19 +58,18 @@ class BaseMiddleware(ABC):
             global_middleware: If True, this middleware runs for all events regardless of namespace.
                     If either `events` or `namespace` is specified, this option is ignored and treated as False.
         """
-        if events is None:
-            self.events: Set[str] = set()
-        elif isinstance(events, str):
-            self.events = {events}
-        else:
-            self.events = set(events)
+        self.events: frozenset[str] = _make_event_filter(events)
 
-        self.namespace = namespace
+        self.namespace = sys.intern(namespace) if namespace else namespace
         self.global_middleware = False if events or namespace else global_middleware
 
     def should_run(self, event: str, namespace: Optional[str] = None) -> bool:
         """Check if middleware should run for given event and namespace.
 
+        The chain only asks this once per (event, namespace) pair and caches
+        the answer, see ``MiddlewareChain.get_hooks``. Chains with a
+        middleware that overrides this method ask on every event instead.
+
         Args:
             event: Event name
             namespace: Namespace name
@@ -54,20 +77,12 @@ class BaseMiddleware(ABC):
         Returns:
             True if middleware should run
         """
-        # Check namespace filter
-        if self.namespace is not None:
-            if namespace != self.namespace:
-                return False
-
-        if self.events:
-            if event not in self.events:
-                return False
-
-        # Global middlewares always run
-        if self.global_middleware:
-            return True
-
-        return True
+        # An empty filter matches everything, global middlewares included
+        namespace_filter = self.namespace
+        if namespace_filter is not None and namespace != namespace_filter:
+            return False
+        events = self.events
+        return not events or event in events
 
     async def before_event(
         self,
@@ -225,6 +240,8 @@ class SyncMiddleware(BaseMiddleware):
     Use this for middlewares that don't need async operations.
     """
 
+    __slots__ = ()
+
     def before_event(
         self,
         event: str,
@@ -305,19 +322,94 @@ class SyncMiddleware(BaseMiddleware):
 
 class MiddlewareChain:
     """Chain of middlewares to execute in sequence.
+
+    The hooks that apply to an (event, namespace) pair are resolved on first
+    use and cached until the chain is modified.
     """
 
     def __init__(self):
         self.middlewares: List[BaseMiddleware] = []
+        self.invalidate()
 
     def add_middleware(self, middleware: BaseMiddleware) -> None:
-        """Add middleware to the chain."""
-        self.middlewares.append(middleware)
+        """Add middleware to the chain.
+
+        Adding a middleware that is already in the chain doesn't add it again,
+        so that it doesn't run twice for the same event. Its filters may have
+        changed though, so the cached hooks are dropped either way.
+        """
+        if not any(m is middleware for m in self.middlewares):
+            self.middlewares.append(middleware)
+        self.invalidate()
 
     def remove_middleware(self, middleware: BaseMiddleware) -> None:
         """Remove middleware from the chain."""
         if middleware in self.middlewares:
             self.middlewares.remove(middleware)
+            self.invalidate()
+
+    def invalidate(self) -> None:
+        """Drop the cached hooks.
+
+        Call this after changing the filters of a middleware that is already
+        part of the chain.
+        """
+        # (before hooks, after hooks) and whether all of them are sync
+        self._hooks: dict[tuple[object, object], tuple[tuple[tuple, tuple], bool]] = {}
+        self._events = frozenset().union(*(m.events for m in self.middlewares))
+        self._namespaces = frozenset(m.namespace for m in self.middlewares)
+        # An overridden should_run() may match events that are in no filter,
+        # so the hooks of such chains are looked up on every event
+        self._cacheable = all(
+            type(m).should_run is BaseMiddleware.should_run for m in self.middlewares
+        )
+
+    def get_hooks(
+        self, event: str, namespace: Optional[str] = None
+    ) -> tuple[tuple, tuple]:
+        """Return the hooks that apply to an event.
+
+        Args:
+            event: Event name
+            namespace: Namespace
+
+        Returns:
+            Tuple of ``before_event`` hooks in chain order and ``after_event``
+            hooks in reverse order, as ``(hook, is_sync)`` pairs
+        """
+        return self._get_hooks(event, namespace)[0]
+
+    def _get_hooks(
+        self, event: str, namespace: Optional[str]
+    ) -> tuple[tuple[tuple, tuple], bool]:
+        cacheable = self._cacheable
+        if cacheable:
+            # Events and namespaces no middleware filters on all behave the
+            # same, so they share a cache entry and the cache stays bounded
+            key = (
+                event if event in self._events else _UNFILTERED,
+                namespace if namespace in self._namespaces else _UNFILTERED,
+            )
+            try:
+                return self._hooks[key]
+            except KeyError:
+                pass
+        applicable = [m for m in self.middlewares if m.should_run(event, namespace)]
+        before_hooks = tuple(
+            (m.before_event, isinstance(m, SyncMiddleware))
+            for m in applicable
+            if _is_overridden(m.before_event)
+        )
+        after_hooks = tuple(
+            (m.after_event, isinstance(m, SyncMiddleware))
+            for m in reversed(applicable)
+            if _is_overridden(m.after_event)
+        )
+        all_sync = all(is_sync for _, is_sync in before_hooks + after_hooks)
+        entry = ((before_hooks, after_hooks), all_sync)
+        if cacheable:
+            self._hooks[key] = entry
+        return entry
 
     async def execute(
         self,
@@ -353,20 +445,19 @@ class MiddlewareChain:
                 return await handler(data, **kwargs)
             return handler(data, **kwargs)
 
+        before_hooks, after_hooks = self._get_hooks(event, namespace)[0]
+
         # Execute middlewares in order
         current_data = data
 
         # Pre-processing: before_event for all middlewares
-        for middleware in self.middlewares:
-            if not middleware.should_run(event, namespace):
-                continue
-
-            if isinstance(middleware, SyncMiddleware):
-                current_data = middleware.before_event(
+        for before_event, is_sync in before_hooks:
+            if is_sync:
+                current_data = before_event(
                     event, sid, current_data, namespace, environ, auth, server, **kwargs
                 )
             else:
-                current_data = await middleware.before_event(
+                current_data = await before_event(
                     event, sid, current_data, namespace, environ, auth, server, **kwargs
                 )
 
@@ -377,48 +468,168 @@ class MiddlewareChain:
             response = handler(sid, current_data, **kwargs)
 
         # Post-processing: after_event for all middlewares (reverse order)
-        for middleware in reversed(self.middlewares):
-            if not middleware.should_run(event, namespace):
-                continue
-
-            if isinstance(middleware, SyncMiddleware):
-                response = middleware.after_event(
+        for after_event, is_sync in after_hooks:
+            if is_sync:
+                response = after_event(
                     event, sid, response, namespace, environ, auth, server, **kwargs
                 )
             else:
-                response = await middleware.after_event(
+                response = await after_event(
                     event, sid, response, namespace, environ, auth, server, **kwargs
                 )
 
         return response
 
+    def execute_sync(
+        self,
+        event: str,
+        sid: str,
+        data: object,
+        handler: Callable[..., Any],
+        namespace: Optional[str] = None,
+        environ: Optional[dict[str, Any]] = None,
+        auth: Optional[dict[str, Any]] = None,
+        server: object = None,
+        **kwargs,
+    ) -> object:
+        """Execute middleware chain without an event loop.
+
+        Used by the synchronous server. When the handler or one of the
+        hooks that apply to the event is async, this returns the coroutine
+        of :meth:`execute` instead.
+
+        Args:
+            event: Event name
+            sid: Socket ID
+            data: Event data
+            handler: Event handler function
+            namespace: Namespace
+            environ: Request environment
+            auth: Authentication data
+            server: Server instance
+            **kwargs: Additional context
+
+        Returns:
+            Final response after all middlewares
+        """
+        # Handlers are analysed once, when they are registered
+        is_async = get_plan(handler).is_async
+        if not self.middlewares and not is_async:
+            # No middlewares, just execute handler
+            return handler(data, **kwargs)
+
+        (before_hooks, after_hooks), all_sync = self._get_hooks(event, namespace)
+        if is_async or not all_sync:
+            return self.execute(
+                event,
+                sid,
+                data,
+                handler,
+                namespace,
+                environ,
+                auth,
+                server,
+                **kwargs,
+            )
+
+        current_data = data
+        for before_event, _ in before_hooks:
+            current_data = before_event(
+                event, sid, current_data, namespace, environ, auth, server, **kwargs
+            )
+
+        response = handler(sid, current_data, **kwargs)
+
+        for after_event, _ in after_hooks:
+            response = after_event(
+                event, sid, response, namespace, environ, auth, server, **kwargs
+            )
+
+        return response
+
+
+_DEFAULT_HOOKS = frozenset(
+    {
+        BaseMiddleware.before_event,
+        BaseMiddleware.after_event,
+        SyncMiddleware.before_event,
+        SyncMiddleware.after_event,
+    }
+)
+
+
+def _is_overridden(hook: Callable[..., Any]) -> bool:
+    # The default hooks return their input unchanged, so they can be skipped
+    return getattr(hook, "__func__", hook) not in _DEFAULT_HOOKS
+
 
 # Convenience functions for creating common middlewares
 
 
-def auth_middleware(auth_checker: Callable[[str, Dict[str, Any]], bool]):
+def auth_middleware(
+    auth_checker: Callable[[str, Dict[str, Any]], bool],
+    cache_ttl: Optional[float] = None,
+):
     """Create an authentication middleware.
 
+    The environ of a client doesn't change while it is connected, so with
+    ``cache_ttl`` a successful check is reused for that many seconds instead
+    of calling ``auth_checker`` on every event. Only use it when revoking
+    access may take that long to apply. Expired checks are dropped once per
+    ``cache_ttl``, whether or not the client's disconnect reaches the
+    middleware.
+
     Args:
         auth_checker: Function that takes sid and environ, returns True if authorized
+        cache_ttl: Seconds to reuse a successful check for, None to check
+            every event
 
     Returns:
         Middleware instance
     """
+    from time import monotonic
 
     class AuthMiddleware(BaseMiddleware):
+        def __init__(self) -> None:
+            super().__init__()
+            self.authorized: dict[str, float] = {}  # sid -> expiry
+            self.next_sweep = 0.0
+
         async def before_event(
             self,
             event: str,
             sid: str,
             data: Any,
-            environ: Optional[Dict[str, Any]] = None,
-            **kwargs,
+            _namespace: Optional[str] = None,
+            environ: Optional[dict[str, Any]] = None,
+            *_args: object,
+            **_kwargs: object,
         ):
+            if cache_ttl is not None:
+                if event == "disconnect":
+                    self.authorized.pop(sid, None)
+                else:
+                    now = monotonic()
+                    if self.authorized.get(sid, 0.0) > now:
+                        return data
+                    if now >= self.next_sweep:
+                        self.sweep(now)
+                    # Don't keep an expired check around if the client is
+                    # refused below
+                    self.authorized.pop(sid, None)
             if not auth_checker(sid, environ or {}):
                 raise PermissionError(f"Unauthorized access for {sid}")
+            if cache_ttl is not None and event != "disconnect":
+                self.authorized[sid] = monotonic() + cache_ttl
             return data
 
+        def sweep(self, now: float) -> None:
+            """Drop expired checks, including those of clients that are gone."""
+            self.authorized = {
+                sid: expiry for sid, expiry in self.authorized.items() if expiry > now
+            }
+            self.next_sweep = now + cache_ttl
+
     return AuthMiddleware()
 
 
@@ -437,12 +648,17 @@ def logging_middleware(logger=None):
         logger = logging.getLogger("fastsio.middleware")
 
     class LoggingMiddleware(BaseMiddleware):
-        async def before_event(self, event: str, sid: str, data: Any, **kwargs):
-            logger.info(f"Event {event} from {sid} with data: {data}")
+        # Messages are only formatted when the logger emits them
+        async def before_event(
+            self, event: str, sid: str, data: Any, *_args: object, **_kwargs: object
+        ):
+            logger.info("Event %s from %s with data: %s", event, sid, data)
             return data
 
-        async def after_event(self, event: str, sid: str, response: Any, **kwargs):
-            logger.info(f"Event {event} from {sid} returned: {response}")
+        async def after_event(
+            self, event: str, sid: str, response: Any, *_args: object, **_kwargs: object
+        ):
+            logger.info("Event %s from %s returned: %s", event, sid, response)
             return response
 
     return LoggingMiddleware()
@@ -451,6 +667,12 @@ def logging_middleware(logger=None):
 def rate_limit_middleware(max_requests: int, window_seconds: int):
     """Create a rate limiting middleware.
 
+    Every client gets a token bucket that holds up to ``max_requests`` tokens
+    and refills at ``max_requests / window_seconds`` tokens per second. Each
+    event takes one token. Buckets are dropped when the client disconnects,
+    and once per window buckets that were idle for a whole window are dropped
+    as well, since those are full again.
+
     Args:
         max_requests: Maximum requests per window
         window_seconds: Time window in seconds
@@ -458,31 +680,55 @@ def rate_limit_middleware(max_requests: int, window_seconds: int):
     Returns:
         Middleware instance
     """
-    import time
-    from collections import defaultdict
+    from time import monotonic
+
+    rate = max_requests / window_seconds
 
     class RateLimitMiddleware(BaseMiddleware):
         def __init__(self):
             super().__init__()
-            self.requests = defaultdict(list)
+            self.buckets: dict[str, list[float]] = {}  # sid -> [tokens, last]
             self.max_requests = max_requests
             self.window_seconds = window_seconds
+            self.next_sweep = monotonic() + window_seconds
 
-        async def before_event(self, event: str, sid: str, data: Any, **kwargs):
-            now = time.time()
-            user_requests = self.requests[sid]
-
-            # Remove old requests outside the window
-            user_requests[:] = [
-                req_time
-                for req_time in user_requests
-                if now - req_time < self.window_seconds
-            ]
+        async def before_event(
+            self, event: str, sid: str, data: Any, *_args: object, **_kwargs: object
+        ):
+            if event == "disconnect":
+                self.buckets.pop(sid, None)
+                return data
+
+            now = monotonic()
+            if now >= self.next_sweep:
+                self.sweep(now)
+            bucket = self.buckets.get(sid)
+            if bucket is None:
+                bucket = self.buckets[sid] = [max_requests, now]
+            else:
+                tokens = bucket[0] + (now - bucket[1]) * rate
+                bucket[0] = tokens if tokens < max_requests else max_requests
+                bucket[1] = now
 
-            if len(user_requests) >= self.max_requests:
+            if bucket[0] < 1:
                 raise RuntimeError(f"Rate limit exceeded for {sid}")
 
-            user_requests.append(now)
+            bucket[0] -= 1
             return data
 
+        def sweep(self, now: float) -> None:
+            """Drop the buckets of clients that were idle for a whole window.
+
+            Disconnects don't reach the middleware when the namespace has no
+            disconnect handler or the middleware filters the event out, so
+            this is what keeps the buckets of gone clients from piling up.
+            """
+            cutoff = now - window_seconds
+            self.buckets = {
+                sid: bucket
+                for sid, bucket in self.buckets.items()
+                if bucket[1] > cutoff
+            }
+            self.next_sweep = now + window_seconds
+
     return RateLimitMiddleware()
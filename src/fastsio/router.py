@@ -1,7 +1,9 @@
 import copy
+import sys
 from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union
 
 from . import base_namespace
+from .dependency import check_plan_event, get_plan
 
 
 class RouterSIO:
@@ -23,7 +25,7 @@ class RouterSIO:
 
     def __init__(self, namespace: Optional[str] = None) -> None:
         # Default namespace applied when not provided explicitly in .on()/@event
-        self.default_namespace: str = namespace or "/"
+        self.default_namespace: str = sys.intern(namespace or "/")
         # Decorator-based function handlers: {namespace: {event: handler}}
         self.handlers: Dict[str, Dict[str, Callable[..., Any]]] = {}
         self.exception_handlers: Dict[Type[BaseException], Callable[..., Any]] = {}
@@ -43,7 +45,7 @@ class RouterSIO:
         channel: Optional[str] = None,
         # asyncapi_from_ast: bool = False,
     ) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
-        ns = namespace or self.default_namespace
+        ns = sys.intern(namespace) if namespace else self.default_namespace
 
         def set_handler(h: Callable[..., Any]) -> Callable[..., Any]:
             if ns not in self.handlers:
@@ -85,7 +87,9 @@ class RouterSIO:
                     h._fastsio_channel_override = channel
                 except Exception:
                     pass
-            self.handlers[ns][event] = h
+            # Analyse the signature once so that dispatch doesn't have to
+            check_plan_event(get_plan(h), event)
+            self.handlers[ns][sys.intern(event)] = h
             return h
 
         if handler is None:
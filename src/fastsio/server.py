@@ -1,3 +1,4 @@
+import asyncio
 import inspect
 import logging
 from typing import Any, Optional
@@ -5,7 +6,14 @@ from typing import Any, Optional
 import engineio
 
 from . import base_server, exceptions, packet
-from .dependency import DependencyContext, _resolve_sync_dependencies
+from .dependency import (
+    _drop_positional,
+    _frame,
+    _push_frame,
+    _resolve_sync_dependencies,
+    get_plan,
+    run_with_context,
+)
 
 default_logger = logging.getLogger("fastsio.server")
 
@@ -746,8 +754,9 @@ class Server(base_server.BaseServer):
                     hasattr(self, "_middleware_chain")
                     and self._middleware_chain.middlewares
                 ):
-                    # Use middleware chain for execution
-                    ret = self._middleware_chain.execute(
+                    # Use middleware chain for execution, synchronous
+                    # hooks and handlers run without an event loop
+                    ret = self._middleware_chain.execute_sync(
                         event=event,
                         sid=original_sid or "",
                         data=payload_data,
@@ -759,101 +768,38 @@ class Server(base_server.BaseServer):
                     )
                 else:
                     # Use ContextVar-based dependency injection
-                    from .dependency import run_with_context
-                    from .types import (
-                        Auth as _AuthType,
-                        Data as _DataType,
-                        Environ as _EnvironType,
-                        Event as _EventType,
-                        Reason as _ReasonType,
-                        SocketID as _SocketIDType,
-                    )
-
-                    def _uses_di(fn: Any) -> bool:
-                        try:
-                            sig_local = inspect.signature(fn)
-                        except Exception:
-                            return False
-                        try:
-                            from .dependency import Depends as _Depends  # type: ignore
-                        except Exception:
-                            _Depends = None  # type: ignore
-                        try:
-                            from pydantic import (  # type: ignore
-                                BaseModel as _PydanticBaseModel,
-                            )
-                        except Exception:
-                            _PydanticBaseModel = None  # type: ignore
-                        for _p in sig_local.parameters.values():
-                            # Heuristic by parameter name commonly used with DI
-                            if _p.name in {
-                                "socket_id",
-                                "environ",
-                                "auth",
-                                "reason",
-                                "data",
-                                "event",
-                            }:
-                                return True
-                            if (
-                                _p.default is not inspect._empty
-                                and _Depends is not None
-                                and isinstance(_p.default, _Depends)
-                            ):
-                                return True
-                            ann = _p.annotation
-                            if ann in (
-                                _SocketIDType,
-                                _EnvironType,
-                                _AuthType,
-                                _ReasonType,
-                                _DataType,
-                                _EventType,
-                            ):
-                                return True
-                            if (
-                                _PydanticBaseModel is not None
-                                and isinstance(ann, type)
-                                and issubclass(ann, _PydanticBaseModel)
-                            ):
-                                return True
-                        return False
-
-                    di_mode = _uses_di(handler)
+                    plan = get_plan(handler)
+                    di_mode = plan.uses_di
 
                     # For sync handlers, we need to handle differently
-                    if inspect.iscoroutinefunction(handler):
+                    if plan.is_async:
                         # This shouldn't happen in sync server, but just in case
-                        import asyncio
-
                         try:
                             asyncio.get_running_loop()
+                        except RuntimeError:
+                            pass  # No loop, create one for this call below
+                        else:
                             # We can't await in sync context, so this is an error
                             raise RuntimeError(
                                 "Async handler in sync server - use AsyncServer instead"
                             )
-                        except RuntimeError as e:
-                            if "no running event loop" in str(e):
-                                # No loop, create one for this call
-                                ret = asyncio.run(
-                                    run_with_context(
-                                        handler,
-                                        *(args if not di_mode else ()),
-                                        socket_id=original_sid,
-                                        environ=computed_environ,
-                                        auth=connect_auth_payload
-                                        if event == "connect"
-                                        else None,
-                                        reason=disconnect_reason
-                                        if event == "disconnect"
-                                        else None,
-                                        data=payload_data,
-                                        event=event,
-                                        server=self,
-                                    )
-                                )
-                            else:
-                                raise
+                        ret = asyncio.run(
+                            run_with_context(
+                                handler,
+                                *(args if not di_mode else ()),
+                                socket_id=original_sid,
+                                environ=computed_environ,
+                                auth=connect_auth_payload
+                                if event == "connect"
+                                else None,
+                                reason=disconnect_reason
+                                if event == "disconnect"
+                                else None,
+                                data=payload_data,
+                                event=event,
+                                server=self,
+                            )
+                        )
                     else:
                         # Sync handler - use sync version of DI
                         ret = self._run_sync_with_context(
@@ -879,8 +825,6 @@ class Server(base_server.BaseServer):
                 if exception_handler is None:
                     raise
                 if inspect.iscoroutinefunction(exception_handler):
-                    import asyncio
-
                     ret = asyncio.run(
                         run_with_context(
                             exception_handler,
@@ -935,10 +879,6 @@ class Server(base_server.BaseServer):
                         computed_environ = None
 
                 if inspect.iscoroutinefunction(exception_handler):
-                    import asyncio
-
-                    from .dependency import run_with_context
-
                     return asyncio.run(
                         run_with_context(
                             exception_handler,
@@ -979,30 +919,21 @@ class Server(base_server.BaseServer):
         This is a simplified version for sync handlers that uses
         sync dependency resolution.
         """
-        with DependencyContext(
-            socket_id=socket_id,
-            environ=environ,
-            auth=auth,
-            reason=reason,
-            data=data,
-            event=event,
-            server=server,
-        ):
-            sig = inspect.signature(func)
+        plan = get_plan(func)
+        # Handlers with nothing to inject never read the frame
+        token = (
+            _push_frame(socket_id, environ, auth, reason, data, event, server)
+            if plan.steps
+            else None
+        )
+        try:
             resolved = _resolve_sync_dependencies(func, **kwargs)
-            # Remove resolved entries that will be satisfied by positional args
-            consumed = 0
-            for name, param in sig.parameters.items():
-                if param.kind in (
-                    inspect.Parameter.POSITIONAL_ONLY,
-                    inspect.Parameter.POSITIONAL_OR_KEYWORD,
-                ) and consumed < len(args):
-                    if name in resolved:
-                        resolved.pop(name)
-                    consumed += 1
-                elif param.kind == inspect.Parameter.VAR_POSITIONAL:
-                    break
+            if args:
+                _drop_positional(plan, resolved, len(args))
             return func(*args, **resolved)
+        finally:
+            if token is not None:
+                _frame.reset(token)
 
     def _handle_eio_connect(self, eio_sid, environ):
         """Handle the Engine.IO connection event."""
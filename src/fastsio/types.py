@@ -5,5 +5,7 @@ SocketID = NewType("SocketID", str)
 Environ = NewType("Environ", dict)
 Auth = NewType("Auth", dict)
 Data = Union[dict, list, str, bool, None, int, bytes]
+# Payload of the event when it is an object, an empty dict otherwise
+DictData = NewType("DictData", dict)
 Reason = NewType("Reason", str)
 Event = NewType("Event", str)
@@ -0,0 +1,323 @@
+from contextvars import copy_context
+from unittest import mock
+
+import pytest
+from pydantic import BaseModel
+
+from fastsio import (
+    Auth,
+    Data,
+    Depends,
+    DictData,
+    Reason,
+    RouterSIO,
+    Server,
+    SocketID,
+    register_dependency,
+)
+from fastsio.dependency import (
+    DependencyContext,
+    HandlerPlan,
+    _dependency_registry,
+    _frame,
+    _resolve_sync_dependencies,
+    build_plan,
+    get_model_validator,
+    get_plan,
+    run_with_context,
+)
+
+
+class Message(BaseModel):
+    text: str
+
+
+def get_value():
+    return 42
+
+
+class TestHandlerPlan:
+    def test_build_plan(self):
+        def handler(sid: SocketID, msg: Message, value=Depends(get_value), *args):
+            pass
+
+        plan = build_plan(handler)
+        assert isinstance(plan, HandlerPlan)
+        assert plan.names == ("sid", "msg", "value", "args")
+        assert plan.positional == ("sid", "msg", "value")
+        assert [step[0] for step in plan.steps] == ["sid", "msg", "value"]
+        assert plan.uses_di is True
+
+    def test_build_plan_without_di(self):
+        def handler(sid, foo, bar=None):
+            pass
+
+        plan = build_plan(handler)
+        assert plan.steps == ()
+        assert plan.uses_di is False
+
+    def test_build_plan_is_async(self):
+        async def async_handler(sid: SocketID):
+            pass
+
+        def sync_handler(sid: SocketID):
+            pass
+
+        assert build_plan(async_handler).is_async is True
+        assert build_plan(sync_handler).is_async is False
+
+    def test_get_plan_is_cached(self):
+        def handler(sid: SocketID):
+            pass
+
+        plan = get_plan(handler)
+        assert get_plan(handler) is plan
+        assert handler._fastsio_plan is plan
+
+    def test_get_plan_bound_method(self):
+        class Handlers:
+            def on_event(self, sid: SocketID):
+                pass
+
+        handlers = Handlers()
+        handler = handlers.on_event
+        plan = get_plan(handler)
+        assert plan.names == ("sid",)
+        assert get_plan(handler) is plan
+        # equal bound methods share the plan while the first one is alive
+        assert get_plan(handlers.on_event) is plan
+
+    def test_plan_built_on_registration(self):
+        router = RouterSIO()
+
+        @router.on("foo")
+        def foo(sid: SocketID, data: Data):
+            pass
+
+        assert isinstance(foo._fastsio_plan, HandlerPlan)
+
+    def test_auth_and_reason_checked_on_registration(self):
+        router = RouterSIO()
+
+        @router.on("connect")
+        def connect(sid: SocketID, auth: Auth):
+            pass
+
+        @router.on("disconnect")
+        def disconnect(sid: SocketID, reason: Reason):
+            pass
+
+        with pytest.raises(ValueError, match="Auth is only available"):
+
+            @router.on("message")
+            def message(sid: SocketID, auth: Auth):
+                pass
+
+        with pytest.raises(ValueError, match="Reason is only available"):
+
+            @router.on("connect")
+            def on_connect(sid: SocketID, reason: Reason):
+                pass
+
+    @mock.patch("fastsio.server.engineio.Server")
+    def test_plan_built_on_server_registration(self, eio):
+        s = Server()
+
+        @s.on("foo")
+        def foo(sid: SocketID, data: Data):
+            pass
+
+        assert isinstance(foo._fastsio_plan, HandlerPlan)
+
+
+class TestResolveSyncDependencies:
+    def test_resolve(self):
+        def handler(sid: SocketID, msg: Message, value=Depends(get_value)):
+            pass
+
+        with DependencyContext(socket_id="abc", data={"text": "hi"}):
+            resolved = _resolve_sync_dependencies(handler)
+        assert resolved == {"sid": "abc", "msg": Message(text="hi"), "value": 42}
+
+    def test_explicit_kwargs_win(self):
+        def handler(sid: SocketID, exc):
+            pass
+
+        with DependencyContext(socket_id="abc"):
+            resolved = _resolve_sync_dependencies(handler, sid="xyz", exc=1)
+        assert resolved == {"sid": "xyz", "exc": 1}
+
+    def test_dict_data(self):
+        def handler(data: DictData):
+            pass
+
+        with DependencyContext(data={"room": "a"}):
+            assert _resolve_sync_dependencies(handler) == {"data": {"room": "a"}}
+        with DependencyContext(data="room"):
+            assert _resolve_sync_dependencies(handler) == {"data": {}}
+
+    def test_named_dependency(self):
+        register_dependency("value", get_value)
+        try:
+
+            def handler(a=Depends("value"), b=Depends(get_value)):
+                pass
+
+            step = build_plan(handler).steps[0]
+            assert step[2].dependency is get_value
+            with DependencyContext(socket_id="abc"):
+                assert _resolve_sync_dependencies(handler) == {"a": 42, "b": 42}
+        finally:
+            del _dependency_registry["value"]
+
+    def test_named_dependency_registered_later(self):
+        def handler(value=Depends("late")):
+            pass
+
+        get_plan(handler)
+        with pytest.raises(ValueError, match="'late' is not registered"):
+            _resolve_sync_dependencies(handler)
+        register_dependency("late", get_value)
+        try:
+            assert _resolve_sync_dependencies(handler) == {"value": 42}
+        finally:
+            del _dependency_registry["late"]
+
+    def test_model_without_data(self):
+        def handler(msg: Message):
+            pass
+
+        with pytest.raises(ValueError, match="no data available"):
+            _resolve_sync_dependencies(handler)
+
+
+class TestModelValidator:
+    def test_complete_model(self):
+        validator = get_model_validator(Message)
+        assert validator == Message.__pydantic_validator__.validate_python
+        assert validator({"text": "hi"}) == Message(text="hi")
+
+    def test_incomplete_model(self):
+        class Node(BaseModel):
+            child: "Missing"  # noqa: F821
+
+        assert get_model_validator(Node) == Node.model_validate
+
+
+class TestDependencyCache:
+    def test_shared_within_event(self):
+        calls = []
+
+        def get_db():
+            calls.append(1)
+            return object()
+
+        def get_service(db=Depends(get_db)):
+            return db
+
+        def handler(db=Depends(get_db), service=Depends(get_service)):
+            pass
+
+        with DependencyContext(socket_id="abc"):
+            resolved = _resolve_sync_dependencies(handler)
+        assert resolved["db"] is resolved["service"]
+        assert len(calls) == 1
+
+        with DependencyContext(socket_id="abc"):
+            _resolve_sync_dependencies(handler)
+        assert len(calls) == 2
+
+    def test_shared_with_nested_context(self):
+        calls = []
+
+        def get_db():
+            calls.append(1)
+            return object()
+
+        def handler(db=Depends(get_db)):
+            pass
+
+        with DependencyContext(socket_id="abc", data="x"):
+            db = _resolve_sync_dependencies(handler)["db"]
+            with DependencyContext(socket_id="abc"):
+                assert _resolve_sync_dependencies(handler)["db"] is db
+            with DependencyContext(data="y"):
+                assert _resolve_sync_dependencies(handler)["db"] is not db
+        assert len(calls) == 2
+
+    def test_use_cache_false(self):
+        calls = []
+
+        def get_db():
+            calls.append(1)
+            return object()
+
+        def handler(
+            a=Depends(get_db, use_cache=False), b=Depends(get_db, use_cache=False)
+        ):
+            pass
+
+        with DependencyContext(socket_id="abc"):
+            resolved = _resolve_sync_dependencies(handler)
+        assert resolved["a"] is not resolved["b"]
+        assert len(calls) == 2
+
+
+class TestDependencyContext:
+    def test_nested_contexts(self):
+        def handler(sid: SocketID, data: Data):
+            pass
+
+        with DependencyContext(socket_id="abc", data="outer"):
+            with DependencyContext(data="inner"):
+                assert _resolve_sync_dependencies(handler) == {
+                    "sid": "abc",
+                    "data": "inner",
+                }
+            assert _resolve_sync_dependencies(handler) == {
+                "sid": "abc",
+                "data": "outer",
+            }
+
+    def test_no_frame_left_behind(self):
+        def handler(sid: SocketID, value=Depends(get_value)):
+            pass
+
+        def resolve():
+            assert _resolve_sync_dependencies(handler) == {"value": 42}
+            return _frame.get()
+
+        # Resolving outside of a context must not make a frame current
+        assert copy_context().run(resolve) is None
+
+    async def test_run_with_context_sync_handler(self):
+        def handler(sid: SocketID, data: Data):
+            return sid, data
+
+        assert await run_with_context(handler, socket_id="abc", data="x") == (
+            "abc",
+            "x",
+        )
+        with DependencyContext(socket_id="outer", data="y"):
+            assert await run_with_context(handler, socket_id="abc") == ("abc", "y")
+            assert _resolve_sync_dependencies(handler) == {
+                "sid": "outer",
+                "data": "y",
+            }
+
+    async def test_run_with_context_nothing_to_inject(self):
+        def handler(sid, data, exc=None):
+            return sid, data, exc
+
+        async def async_handler(sid, data):
+            return sid, data
+
+        assert await run_with_context(handler, "abc", "x", socket_id="abc", exc=1) == (
+            "abc",
+            "x",
+            1,
+        )
+        assert await run_with_context(async_handler, "abc", "x", data="x") == (
+            "abc",
+            "x",
+        )
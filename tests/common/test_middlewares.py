@@ -3,7 +3,7 @@ Tests for the middleware system.
 """
 
 import pytest
-from unittest.mock import Mock, MagicMock
+from unittest.mock import MagicMock, Mock, patch
 
 from src.fastsio.middlewares import (
     BaseMiddleware,
@@ -36,6 +36,7 @@ class TestBaseMiddleware:
         """Test middleware initialization with event list."""
         middleware = BaseMiddleware(events=["event1", "event2"])
         assert middleware.events == {"event1", "event2"}
+        assert isinstance(middleware.events, frozenset)
         assert middleware.global_middleware is False
         assert middleware.namespace is None
 
@@ -53,6 +54,11 @@ class TestBaseMiddleware:
         assert middleware.events == set()
         assert middleware.namespace is None
 
+    def test_slots(self):
+        """Test the base classes don't give instances a __dict__."""
+        assert not hasattr(BaseMiddleware(), "__dict__")
+        assert not hasattr(SyncMiddleware(), "__dict__")
+
     def test_should_run_global(self):
         """Test should_run for global middleware."""
         middleware = BaseMiddleware(global_middleware=True)
@@ -171,6 +177,15 @@ class TestMiddlewareChain:
         chain.add_middleware(middleware)
         assert middleware in chain.middlewares
 
+    def test_add_middleware_twice(self):
+        """Test adding the same middleware twice keeps a single entry."""
+        chain = MiddlewareChain()
+        middleware = BaseMiddleware()
+
+        chain.add_middleware(middleware)
+        chain.add_middleware(middleware)
+        assert chain.middlewares == [middleware]
+
     def test_remove_middleware(self):
         """Test removing middleware from chain."""
         chain = MiddlewareChain()
@@ -285,6 +300,140 @@ class TestMiddlewareChain:
         assert result == "response"
         handler.assert_called_once_with("test_sid", "filtered_test_data")
 
+    @pytest.mark.asyncio
+    async def test_execute_custom_should_run(self):
+        """Test an overridden should_run is asked for every event."""
+        chain = MiddlewareChain()
+
+        class AdminMiddleware(BaseMiddleware):
+            def should_run(self, event, namespace=None):
+                return event.startswith("admin.")
+
+            async def before_event(self, event, sid, data, *args, **kwargs):
+                return f"admin_{data}"
+
+        chain.add_middleware(AdminMiddleware())
+        handler = Mock(return_value="response")
+
+        await chain.execute("chat.msg", "test_sid", "data", handler)
+        handler.assert_called_once_with("test_sid", "data")
+
+        handler.reset_mock()
+        await chain.execute("admin.kick", "test_sid", "data", handler)
+        handler.assert_called_once_with("test_sid", "admin_data")
+
+        handler.reset_mock()
+        await chain.execute("chat.msg", "test_sid", "data", handler)
+        handler.assert_called_once_with("test_sid", "data")
+
+    def test_execute_sync(self):
+        """Test sync middlewares and handlers run without an event loop."""
+
+        class Upper(SyncMiddleware):
+            def before_event(self, event, sid, data, *args, **kwargs):
+                return data.upper()
+
+            def after_event(self, event, sid, response, *args, **kwargs):
+                return {"wrapped": response}
+
+        chain = MiddlewareChain()
+        chain.add_middleware(Upper())
+        handler = Mock(return_value="response")
+
+        result = chain.execute_sync("test_event", "test_sid", "test_data", handler)
+
+        assert result == {"wrapped": "response"}
+        handler.assert_called_once_with("test_sid", "TEST_DATA")
+
+    @pytest.mark.asyncio
+    async def test_execute_sync_with_async_hook(self):
+        """Test execute_sync defers to execute when a hook is async."""
+
+        class AsyncUpper(BaseMiddleware):
+            async def before_event(self, event, sid, data, *args, **kwargs):
+                return data.upper()
+
+        chain = MiddlewareChain()
+        chain.add_middleware(AsyncUpper())
+        handler = Mock(return_value="response")
+
+        result = chain.execute_sync("test_event", "test_sid", "test_data", handler)
+        handler.assert_not_called()
+
+        assert await result == "response"
+        handler.assert_called_once_with("test_sid", "TEST_DATA")
+
+    def test_get_hooks(self):
+        """Test hooks are resolved per event and cached."""
+
+        class First(BaseMiddleware):
+            async def before_event(self, event, sid, data, **kwargs):
+                return data
+
+            async def after_event(self, event, sid, response, **kwargs):
+                return response
+
+        class Second(SyncMiddleware):
+            def before_event(self, event, sid, data, **kwargs):
+                return data
+
+            def after_event(self, event, sid, response, **kwargs):
+                return response
+
+        chain = MiddlewareChain()
+        first = First()
+        second = Second(events=["event1"])
+        chain.add_middleware(first)
+        chain.add_middleware(second)
+
+        before, after = chain.get_hooks("event1", "/")
+        assert before == ((first.before_event, False), (second.before_event, True))
+        assert after == ((second.after_event, True), (first.after_event, False))
+        assert chain.get_hooks("event1", "/") is chain.get_hooks("event1", "/")
+
+        # Events no middleware filters on share a single cache entry
+        assert chain.get_hooks("event2", "/") is chain.get_hooks("event3", "/a")
+        assert chain.get_hooks("event2", "/")[0] == ((first.before_event, False),)
+
+    def test_get_hooks_skips_default_hooks(self):
+        """Test hooks that are not overridden are not called."""
+
+        class BeforeOnly(SyncMiddleware):
+            def before_event(self, event, sid, data, **kwargs):
+                return data
+
+        chain = MiddlewareChain()
+        middleware = BeforeOnly()
+        chain.add_middleware(BaseMiddleware())
+        chain.add_middleware(middleware)
+
+        before, after = chain.get_hooks("event", "/")
+        assert before == ((middleware.before_event, True),)
+        assert after == ()
+
+    def test_get_hooks_invalidated(self):
+        """Test cached hooks are dropped when the chain changes."""
+
+        class Passthrough(BaseMiddleware):
+            async def before_event(self, event, sid, data, **kwargs):
+                return data
+
+        chain = MiddlewareChain()
+        first = Passthrough()
+        chain.add_middleware(first)
+        assert len(chain.get_hooks("event", "/")[0]) == 1
+
+        second = Passthrough()
+        chain.add_middleware(second)
+        assert len(chain.get_hooks("event", "/")[0]) == 2
+
+        chain.remove_middleware(first)
+        assert chain.get_hooks("event", "/")[0] == ((second.before_event, False),)
+
+        second.namespace = "/other"
+        chain.invalidate()
+        assert chain.get_hooks("event", "/")[0] == ()
+
 
 class TestConvenienceMiddlewares:
     """Test convenience middleware functions."""
@@ -299,18 +448,118 @@ class TestConvenienceMiddlewares:
         assert isinstance(middleware, BaseMiddleware)
         assert middleware.events == set()  # Applies to all events
 
+    @pytest.mark.asyncio
+    async def test_auth_middleware_cache(self):
+        """Test auth_middleware reuses successful checks with cache_ttl."""
+        auth_checker = Mock(return_value=True)
+        chain = MiddlewareChain()
+        chain.add_middleware(auth_middleware(auth_checker, cache_ttl=60))
+        handler = Mock(return_value="response")
+        environ = {"HTTP_AUTHORIZATION": "Bearer token"}
+
+        for _ in range(3):
+            assert (
+                await chain.execute("event", "sid1", "data", handler, "/", environ)
+                == "response"
+            )
+        auth_checker.assert_called_once_with("sid1", environ)
+
+        await chain.execute("disconnect", "sid1", None, handler, "/", environ)
+        auth_checker.return_value = False
+        with pytest.raises(PermissionError):
+            await chain.execute("event", "sid1", "data", handler, "/", environ)
+
+    @pytest.mark.asyncio
+    async def test_auth_middleware_cache_expires(self):
+        """Test auth_middleware drops expired checks of gone clients."""
+        now = [1000.0]
+        auth_checker = Mock(return_value=True)
+        with patch("time.monotonic", lambda: now[0]):
+            middleware = auth_middleware(auth_checker, cache_ttl=10)
+            chain = MiddlewareChain()
+            chain.add_middleware(middleware)
+            handler = Mock(return_value="response")
+
+            await chain.execute("event", "sid1", "data", handler, "/", {})
+            await chain.execute("event", "sid1", "data", handler, "/", {})
+            assert auth_checker.call_count == 1
+
+            # sid1 goes away without its disconnect reaching the middleware
+            now[0] += 11
+            await chain.execute("event", "sid2", "data", handler, "/", {})
+        assert list(middleware.authorized) == ["sid2"]
+        assert auth_checker.call_count == 2
+
     def test_logging_middleware(self):
         """Test logging_middleware function."""
         middleware = logging_middleware()
         assert isinstance(middleware, BaseMiddleware)
         assert middleware.events == set()  # Applies to all events
 
+    @pytest.mark.asyncio
+    async def test_logging_middleware_formats_lazily(self):
+        """Test logging_middleware leaves formatting to the logger."""
+        logger = Mock()
+        chain = MiddlewareChain()
+        chain.add_middleware(logging_middleware(logger))
+
+        data = object()
+        response = object()
+        handler = Mock(return_value=response)
+        assert await chain.execute("event", "sid1", data, handler, "/") is response
+        assert logger.info.call_args_list == [
+            (("Event %s from %s with data: %s", "event", "sid1", data),),
+            (("Event %s from %s returned: %s", "event", "sid1", response),),
+        ]
+
     def test_rate_limit_middleware(self):
         """Test rate_limit_middleware function."""
         middleware = rate_limit_middleware(max_requests=5, window_seconds=60)
         assert isinstance(middleware, BaseMiddleware)
         assert middleware.events == set()  # Applies to all events
 
+    @pytest.mark.asyncio
+    async def test_rate_limit_middleware_limits(self):
+        """Test rate_limit_middleware rejects requests over the limit."""
+        middleware = rate_limit_middleware(max_requests=2, window_seconds=60)
+
+        assert await middleware.before_event("event", "sid1", "data") == "data"
+        assert await middleware.before_event("event", "sid1", "data") == "data"
+        with pytest.raises(RuntimeError, match="Rate limit exceeded"):
+            await middleware.before_event("event", "sid1", "data")
+
+        # Other clients have their own bucket
+        assert await middleware.before_event("event", "sid2", "data") == "data"
+
+        # Disconnecting drops the bucket
+        await middleware.before_event("disconnect", "sid1", None)
+        assert "sid1" not in middleware.buckets
+        assert await middleware.before_event("event", "sid1", "data") == "data"
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_middleware_in_chain(self):
+        """Test rate_limit_middleware runs in a chain and drops idle buckets."""
+        now = [1000.0]
+        with patch("time.monotonic", lambda: now[0]):
+            middleware = rate_limit_middleware(max_requests=2, window_seconds=10)
+        chain = MiddlewareChain()
+        chain.add_middleware(middleware)
+        handler = Mock(return_value="response")
+
+        with patch("time.monotonic", lambda: now[0]):
+            for _ in range(2):
+                assert (
+                    await chain.execute("event", "sid1", "data", handler, "/")
+                    == "response"
+                )
+            with pytest.raises(RuntimeError, match="Rate limit exceeded"):
+                await chain.execute("event", "sid1", "data", handler, "/")
+
+            # sid1 goes away without its disconnect reaching the middleware
+            now[0] += 11
+            await chain.execute("event", "sid2", "data", handler, "/")
+        assert list(middleware.buckets) == ["sid2"]
+
 
 class TestMiddlewareIntegration:
     """Test middleware integration with server."""
@@ -356,6 +605,49 @@ class TestMiddlewareIntegration:
         assert result["received"]["modified"] is True
         assert result["handler_called"] is True
 
+    def test_sync_middleware_with_sync_server(self):
+        """Test sync middlewares run inline in the sync server."""
+        from fastsio import Server, SyncMiddleware
+
+        server = Server()
+
+        class DataModifierMiddleware(SyncMiddleware):
+            def before_event(self, event, sid, data, *args, **kwargs):
+                return {**data, "modified": True}
+
+        server.add_middleware(DataModifierMiddleware())
+
+        @server.event
+        def test_event(sid, data):
+            return {"received": data, "handler_called": True}
+
+        result = server._trigger_event("test_event", "/", "test_sid", {"test": "data"})
+
+        assert result == {
+            "received": {"test": "data", "modified": True},
+            "handler_called": True,
+        }
+
+    def test_readd_middleware_with_other_filters(self):
+        """Test re-adding a middleware applies its new filters."""
+        from fastsio import Server, SyncMiddleware
+
+        server = Server()
+
+        class Passthrough(SyncMiddleware):
+            def before_event(self, event, sid, data, *args, **kwargs):
+                return data
+
+        middleware = Passthrough()
+        server.add_middleware(middleware)
+        chain = server._middleware_chain
+        assert len(chain.get_hooks("event", "/")[0]) == 1
+
+        server.add_middleware(middleware, namespace="/admin")
+        assert server.get_middlewares() == [middleware]
+        assert chain.get_hooks("event", "/")[0] == ()
+        assert len(chain.get_hooks("event", "/admin")[0]) == 1
+
     @pytest.mark.asyncio
     async def test_middleware_with_async_handler(self):
         """Test middleware with asynchronous handler."""
@@ -3,6 +3,7 @@ from unittest import mock
 
 import pytest
 from engineio import json, packet as eio_packet
+from pydantic import BaseModel
 
 from fastsio import (
     Data,
@@ -159,6 +160,48 @@ class TestServer:
         assert handler._fastsio_response_model is str
         assert handler._fastsio_channel_override == "custom/channel"
 
+    def test_validate_response(self, eio):
+        class Reply(BaseModel):
+            text: str
+
+        class Count(BaseModel):
+            count: int
+
+        s = server.Server()
+
+        @s.on("single", response_model=Reply)
+        def single():
+            pass
+
+        @s.on("multi", response_model={"reply": Reply, "count": Count})
+        def multi():
+            pass
+
+        assert s._validate_response(single, {"text": "hi"}) == Reply(text="hi")
+        reply = Reply(text="hi")
+        assert s._validate_response(single, reply) is reply
+        assert single._fastsio_response_validators[0] is Reply
+        with pytest.raises(ValueError, match="Failed to validate response data"):
+            s._validate_response(single, {})
+
+        assert s._validate_response(multi, ("reply", {"text": "hi"}, 1)) == (
+            "reply",
+            Reply(text="hi"),
+            1,
+        )
+        assert s._validate_response(multi, ("count", {"count": "5"})) == (
+            "count",
+            Count(count=5),
+        )
+        with pytest.raises(ValueError, match="not found in response_model"):
+            s._validate_response(multi, ("other", {}))
+
+    def test_validate_response_mock_handler(self, eio):
+        s = server.Server()
+        handler = mock.Mock()
+        assert s._validate_response(handler, "response") == "response"
+        assert s._validate_response(handler, "response") == "response"
+
     def test_nested_router_prefixes_namespace_handlers(self, eio):
         class MyNamespace(namespace.Namespace):
             pass
@@ -215,6 +258,32 @@ class TestServer:
 
         assert s._trigger_event("boom", "/", "1") == {"sid": "1", "name": "spark"}
 
+    def test_async_handler(self, eio):
+        s = server.Server()
+
+        @s.on("foo")
+        async def foo(sid: SocketID, data: Data):
+            return sid, data
+
+        @s.on("bar")
+        async def bar(sid):
+            raise ValueError("bar")
+
+        assert s._trigger_event("foo", "/", "1", "x") == ("1", "x")
+        with pytest.raises(ValueError) as exc_info:
+            s._trigger_event("bar", "/", "1")
+        assert exc_info.value.__context__ is None
+
+    async def test_async_handler_with_running_loop(self, eio):
+        s = server.Server()
+
+        @s.on("foo")
+        async def foo(sid):
+            pass
+
+        with pytest.raises(RuntimeError, match="use AsyncServer instead"):
+            s._trigger_event("foo", "/", "1")
+
     def test_router_exception_handler_only_applies_to_router(self, eio):
         class UnicornException(Exception):
             pass
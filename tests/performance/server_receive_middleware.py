@@ -0,0 +1,34 @@
+import time
+
+import fastsio
+
+
+class PassThrough(fastsio.SyncMiddleware):
+    def before_event(self, event, sid, data, *args, **kwargs):
+        return data
+
+
+def test():
+    s = fastsio.Server(async_handlers=False)
+    s.add_middleware(PassThrough())
+    s.add_middleware(PassThrough(events=["other"]))
+
+    @s.on("test")
+    def test_handler(sid, data):
+        pass
+
+    start = time.time()
+    count = 0
+    s._handle_eio_connect("123", "environ")
+    s._handle_eio_message("123", "0")
+    while True:
+        s._handle_eio_message("123", '2["test","hello"]')
+        count += 1
+        if time.time() - start >= 5:
+            break
+    return count
+
+
+if __name__ == "__main__":
+    count = test()
+    print("server_receive_middleware:", count, "packets received.")